@@ -0,0 +1,20 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Run the suite without the shipped throttle rates.
+
+    The counters outlive each test (and, in the file cache, each run), while
+    user ids and the client IP repeat, so the limits would trip on unrelated
+    tests. Throttling tests set their own rates.
+    """
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.throttle_override = override_settings(TODOS_THROTTLE_RATES={})
+        self.throttle_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.throttle_override.disable()
+        super().teardown_test_environment(**kwargs)
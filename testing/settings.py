@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'todos.instrumentation.ServerTimingMiddleware',
+    'todos.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +59,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'testing.urls'
 
+# Clears TODOS_THROTTLE_RATES for the test suite.
+TEST_RUNNER = 'testing.runner.TestRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -78,19 +84,134 @@ WSGI_APPLICATION = 'testing.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+# todos.db.sqlite3 applies WAL and other pragmas on connect, starts
+# transactions with BEGIN IMMEDIATE and retries writes that hit a lock.
+# Connections are kept for CONN_MAX_AGE seconds instead of per request.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'todos.db.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'pragmas': {
+                'journal_mode': 'wal',
+                'synchronous': 'normal',
+                'busy_timeout': 5000,
+                'cache_size': -20000,
+                'mmap_size': 134217728,
+            },
+            'transaction_mode': 'IMMEDIATE',
+            'lock_retries': 5,
+            'lock_retry_backoff': 0.01,
+        },
     }
 }
 
+# Aliases in DATABASES that hold read-only copies of 'default'. GET/HEAD
+# requests read from a random one until they write; everything else uses
+# 'default'. e.g. 'replica': {'ENGINE': 'todos.db.sqlite3',
+# 'NAME': BASE_DIR / 'replica.sqlite3'} and TODOS_READ_REPLICAS = ['replica'].
+# For this long after an owner's write, their cached lists are rebuilt from
+# 'default' so a lagging replica can't fill the cache with stale pages.
+TODOS_READ_REPLICAS = []
+TODOS_REPLICA_LAG_SECONDS = 5
+DATABASE_ROUTERS = ['todos.replicas.ReadReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'todos',
+    },
+    # Throttle counters, shared by every worker process on the host. Its
+    # incr() is read-then-write, so concurrent workers may let a few extra
+    # requests through; a redis or memcached alias counts exactly.
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'throttle_cache',
+    },
+}
+
+# Seconds a serialized todo/tag list page stays cached; 0 disables it.
+TODOS_LIST_CACHE_TIMEOUT = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.TokenAuthentication',
-    ]
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'todos.throttling.ReadWriteRateThrottle',
+    ],
+}
+
+# Requests allowed per user (per IP before login) for each throttle scope,
+# as '<count>/<s|min|hour|day>'. Scopes are 'todos', 'tags' and 'auth'
+# (the auth/ routes), each with a '.read' (GET/HEAD/OPTIONS) and '.write'
+# limit; a scope left out is not throttled.
+TODOS_THROTTLE_RATES = {
+    'todos.read': '600/min',
+    'todos.write': '120/min',
+    'tags.read': '600/min',
+    'tags.write': '120/min',
+    'auth.read': '120/min',
+    'auth.write': '20/min',
+}
+# Cache alias holding the throttle counters.
+TODOS_THROTTLE_CACHE = 'throttle'
+
+# manage.py run_reminders: deliver a reminder this many minutes before a
+# todo's desired_end_date, to the sink class below (todos.reminders.LogSink,
+# WebhookSink posting to TODOS_REMINDER_WEBHOOK_URL, or OutboxSink writing
+# ReminderOutbox rows), at most TODOS_REMINDER_BATCH_SIZE per call. The
+# worker holds the next TODOS_REMINDER_WINDOW_MINUTES of reminders in memory.
+# A batch the sink fails on is retried after TODOS_REMINDER_RETRY_SECONDS,
+# doubled per consecutive failure, up to an hour.
+TODOS_REMINDER_LEAD_MINUTES = 60
+TODOS_REMINDER_SINK = 'todos.reminders.LogSink'
+TODOS_REMINDER_WEBHOOK_URL = None
+TODOS_REMINDER_BATCH_SIZE = 100
+TODOS_REMINDER_WINDOW_MINUTES = 60
+TODOS_REMINDER_RETRY_SECONDS = 30
+
+# Read routes served by the async views in todos.async_views when running
+# under testing.asgi; any of 'todos-list', 'todos-detail', 'tags-list' and
+# 'todo-list-by-tag'. TODOS_ASYNC_VIEWS also mounts all of them under async/.
+TODOS_ASYNC_ROUTES = []
+TODOS_ASYNC_VIEWS = False
+
+# Signed access tokens are issued from auth/jwt/create/. The todo, tag and
+# todoList views trust the user id claim without loading the user; DRF
+# tokens keep working alongside them.
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Also return a JWT pair from the signup response.
+TODOS_JWT_SIGNUP = False
+
+# Create tags named in a todo's tag_list that the owner doesn't have yet,
+# instead of rejecting the write.
+TODOS_CREATE_MISSING_TAGS = False
+
+# Rows per model in one sync/ response. Cursors older than the tombstone
+# age get 410 Gone; keep it at or below purge_todos --days.
+TODOS_SYNC_PAGE_SIZE = 500
+TODOS_SYNC_TOMBSTONE_DAYS = 30
+# Seconds the sync cursor stays behind now, so rows stamped before a slow
+# transaction commits are not skipped; rows newer than that are re-sent.
+TODOS_SYNC_LAG_SECONDS = 5
+
+# Add a Server-Timing header (db, auth, serialize, render, total) to every
+# response, and log requests slower than TODOS_SLOW_REQUEST_MS or running
+# more than TODOS_SLOW_REQUEST_QUERIES queries to 'todos.timing', with
+# their TODOS_SLOW_REQUEST_LOG_QUERIES slowest statements.
+TODOS_SERVER_TIMING = False
+TODOS_SLOW_REQUEST_MS = 500
+TODOS_SLOW_REQUEST_QUERIES = 50
+TODOS_SLOW_REQUEST_LOG_QUERIES = 3
+
 DJOSER = {
     'USER_CREATE_PASSWORD_RETYPE': True,
     'SERIALIZERS': {
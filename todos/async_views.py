@@ -0,0 +1,184 @@
+"""
+Native async read endpoints for the ASGI deployment.
+
+Each view answers GET/HEAD itself and hands every other method to the sync
+DRF view for the same route. The read path is the sync view's own: an
+instance of its class supplies the throttles, filter backends (owner and
+``?fields=``), paginator, list cache keys and, for todos, the ``values()``
+renderer, so both paths return the same responses and share cached pages.
+Only the I/O is awaited. On Django versions with the async ORM
+(``QuerySet.aiterator``, 4.1+) querysets are iterated natively; on older
+versions each query runs in one ``sync_to_async`` hop instead of holding a
+worker thread for the whole request.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.urls import path
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import Throttled
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTTokenUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from . import cache, views
+from .fast import FastTodoListMixin, group_tag_names, render_todos, requested_todo_fields, tag_links, todo_values
+from .instrumentation import measure
+
+jwt_authentication = JWTTokenUserAuthentication()
+
+
+async def fetch(queryset):
+    if hasattr(queryset, 'aiterator'):
+        return [obj async for obj in queryset]
+    return await sync_to_async(list)(queryset)
+
+
+async def authenticate(request):
+    """
+    Return the user for a ``Bearer`` JWT or DRF ``Token`` header.
+    """
+    header = request.headers.get('Authorization', '').split()
+    if len(header) != 2:
+        return None
+    keyword, key = header
+    if keyword == 'Bearer':
+        try:
+            return jwt_authentication.get_user(jwt_authentication.get_validated_token(key))
+        except (InvalidToken, TokenError):
+            return None
+    if keyword == 'Token':
+        tokens = await fetch(Token.objects.filter(key=key, user__is_active=True).select_related('user'))
+        return tokens[0].user if tokens else None
+    return None
+
+
+def render(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+async def check_throttles(view, request):
+    """
+    Run the view's throttles; return a 429 response if one refuses.
+    """
+    for throttle in view.get_throttles():
+        if not await sync_to_async(throttle.allow_request)(request, view):
+            exc = Throttled(throttle.wait())
+            response = render({'detail': exc.detail}, exc.status_code)
+            response['Retry-After'] = '%d' % exc.wait
+            return response
+    return None
+
+
+def read_only(view_class, action, fallback):
+    """
+    Serve safe methods with the decorated async handler, the rest with
+    ``fallback``. The handler gets an instance of ``view_class`` set up for
+    ``action`` and the authenticated DRF request.
+    """
+    fallback = sync_to_async(fallback)
+
+    def decorator(handler):
+        async def dispatch(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await fallback(request, *args, **kwargs)
+            with measure('auth'):
+                user = await authenticate(request)
+            if user is None:
+                return render(
+                    {'detail': 'Authentication credentials were not provided.'},
+                    status.HTTP_401_UNAUTHORIZED,
+                )
+            drf_request = Request(request)
+            drf_request.user = user
+            view = view_class(action=action, args=args, kwargs=kwargs, request=drf_request, format_kwarg=None)
+            view.headers = {}
+            throttled = await check_throttles(view, drf_request)
+            if throttled is not None:
+                return throttled
+            return await handler(view, drf_request)
+        # csrf_exempt() would wrap the coroutine in a sync function on 4.0.
+        dispatch.csrf_exempt = True
+        return dispatch
+    return decorator
+
+
+async def page_data(view, request):
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.paginator
+    if isinstance(view, FastTodoListMixin):
+        fields = requested_todo_fields(request)
+        rows = await fetch(paginator.get_page_queryset(todo_values(queryset, fields), request, view))
+        page = paginator.set_page(rows)
+        tag_names = None
+        if 'tag_list' in fields:
+            tag_names = group_tag_names(await fetch(tag_links([row['id'] for row in page])))
+        data = render_todos(page, fields, tag_names)
+    else:
+        page = paginator.set_page(await fetch(paginator.get_page_queryset(queryset, request, view)))
+        data = view.get_serializer(page, many=True).data
+    return paginator.get_paginated_response(data).data
+
+
+async def cached_list(view, request):
+    """
+    ``CachedListMixin.list()`` with awaited cache calls.
+    """
+    timeout = cache.get_timeout()
+    if not timeout:
+        return render(await page_data(view, request))
+    backend = cache.get_cache()
+    keys = cache.list_keys(view, request)
+    cached = await backend.aget_many(keys)
+    version, data = cache.lookup(keys, cached)
+    if data is not None:
+        return render(data)
+    if version is None:
+        version = await sync_to_async(cache.new_version)(backend, keys[0])
+    with cache.rebuilding(keys, cached):
+        data = await page_data(view, request)
+    await backend.aset(keys[1], (version, data), timeout)
+    return render(data)
+
+
+@read_only(views.TodoViewSet, 'list', views.TodoViewSet.as_view({'post': 'create'}))
+async def todo_list(view, request):
+    return await cached_list(view, request)
+
+
+@read_only(views.TodoViewSet, 'retrieve', views.TodoViewSet.as_view({
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}))
+async def todo_detail(view, request):
+    queryset = view.filter_queryset(view.get_queryset()).filter(pk=view.kwargs['pk'])
+    todos = await fetch(queryset)
+    if not todos:
+        return render({'detail': 'Not found.'}, status.HTTP_404_NOT_FOUND)
+    return render(view.get_serializer(todos[0]).data)
+
+
+@read_only(views.TagViewSet, 'list', views.TagViewSet.as_view({'post': 'create'}))
+async def tag_list(view, request):
+    return await cached_list(view, request)
+
+
+@read_only(views.TodoListByTag, None, views.TodoListByTag.as_view())
+async def todo_list_by_tag(view, request):
+    return await cached_list(view, request)
+
+
+# Route name -> (route, view). Names match the sync routes they replace.
+ROUTES = {
+    'todos-list': ('todos/', todo_list),
+    'todos-detail': ('todos/<int:pk>/', todo_detail),
+    'tags-list': ('tags/', tag_list),
+    'todo-list-by-tag': ('tags/<int:pk>/todoList/', todo_list_by_tag),
+}
+
+urlpatterns = [
+    path(route, view, name='async-' + name)
+    for name, (route, view) in ROUTES.items()
+]
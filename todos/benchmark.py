@@ -0,0 +1,249 @@
+"""
+Seeded load generation for ``manage.py bench_api``.
+
+Data is generated from a fixed random seed and every scenario runs the
+same requests in the same order, so two runs with the same options on the
+same machine can be compared endpoint by endpoint.
+"""
+import io
+import json
+import math
+import platform
+import random
+import sqlite3
+import time
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import stats
+from .bulk import TagLink, refresh_tag_counts
+from .models import Todo, Tag
+
+WORDS = (
+    'report meeting review draft invoice release deploy email call budget '
+    'design plan fix test update backup cleanup order book schedule '
+    'groceries gym doctor travel study reading laundry garden taxes rent'
+).split()
+USERNAME = 'bench%d'
+
+
+def seed(users=5, todos=1000, tags=50, fan_out=3, random_seed=0):
+    """
+    Insert ``users`` users, each with ``todos`` todos and ``tags`` tags.
+
+    Every todo gets on average ``fan_out`` tags, drawn with a Zipf-like
+    weight so a few tags are on most todos, as in real accounts. Returns the
+    context the scenarios need: per user, its token and todo and tag ids.
+    """
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    password = make_password('bench-password')
+    User.objects.bulk_create([
+        User(username=USERNAME % i, email='%s@example.com' % (USERNAME % i), password=password)
+        for i in range(users)
+    ])
+    owners = list(User.objects.filter(username__in=[USERNAME % i for i in range(users)]).order_by('id'))
+    Token.objects.bulk_create([Token(user=owner, key=Token.generate_key()) for owner in owners])
+
+    context = []
+    for owner in owners:
+        owner_tags = Tag.objects.bulk_create([
+            Tag(owner=owner, name='%s-%d' % (rng.choice(WORDS), i)) for i in range(tags)
+        ])
+        weights = [1 / (rank + 1) for rank in range(len(owner_tags))]
+        owner_todos = []
+        for _ in range(todos):
+            deadline = now + timezone.timedelta(hours=rng.randint(-30 * 24, 30 * 24)) if rng.random() < 0.7 else None
+            owner_todos.append(Todo(
+                owner=owner,
+                title=' '.join(rng.choices(WORDS, k=3)),
+                description=' '.join(rng.choices(WORDS, k=8)) if rng.random() < 0.6 else None,
+                desired_end_date=deadline,
+                is_ended=rng.random() < 0.2,
+            ))
+        Todo.objects.bulk_create(owner_todos, batch_size=500)
+        links = []
+        for todo in owner_todos:
+            count = min(len(owner_tags), rng.randint(0, 2 * fan_out)) if owner_tags else 0
+            for tag in set(rng.choices(owner_tags, weights, k=count)):
+                links.append(TagLink(todo_id=todo.id, tag_id=tag.id))
+        TagLink.objects.bulk_create(links, batch_size=1000)
+        refresh_tag_counts([tag.id for tag in owner_tags])
+        stats.rebuild(owner.id)
+        context.append({
+            'user': owner,
+            'token': owner.auth_token.key,
+            'todos': [todo.id for todo in owner_todos],
+            'tags': [tag.id for tag in owner_tags],
+        })
+    return context
+
+
+def _window(ids, i, size):
+    start = i * size % len(ids)
+    return ids[start:start + size]
+
+
+def _import_file(owner, i):
+    upload = io.BytesIO(''.join(
+        json.dumps({'title': 'imported %d %d' % (i, n), 'tag_list': ['imported']}) + '\n' for n in range(20)
+    ).encode())
+    upload.name = 'todos.ndjson'
+    return {'file': upload}
+
+
+# (name, method, build). build(owner, i) returns (url, data, format); the
+# order matters: destructive scenarios run last and use their own rows.
+SCENARIOS = [
+    ('api-root', 'get', lambda owner, i: (reverse('api-root'), None, None)),
+    ('todos-list', 'get', lambda owner, i: (reverse('todos-list'), None, None)),
+    ('todos-list-fields', 'get', lambda owner, i: (reverse('todos-list') + '?fields=id,title', None, None)),
+    ('todos-detail', 'get', lambda owner, i: (
+        reverse('todos-detail', args=[owner['todos'][i % len(owner['todos'])]]), None, None)),
+    ('todos-deadlines', 'get', lambda owner, i: (reverse('todos-deadlines') + '?overdue=true', None, None)),
+    ('todos-within3days', 'get', lambda owner, i: (reverse('todos-within3days'), None, None)),
+    ('todos-search', 'get', lambda owner, i: (
+        reverse('todos-search') + '?q=' + WORDS[i % len(WORDS)], None, None)),
+    ('todos-export', 'get', lambda owner, i: (reverse('todos-export'), None, None)),
+    ('tags-list', 'get', lambda owner, i: (reverse('tags-list'), None, None)),
+    ('tags-detail', 'get', lambda owner, i: (
+        reverse('tags-detail', args=[owner['tags'][i % len(owner['tags'])]]), None, None)),
+    ('todo-list-by-tag', 'get', lambda owner, i: (
+        reverse('todo-list-by-tag', args=[owner['tags'][0]]), None, None)),
+    ('sync', 'get', lambda owner, i: (reverse('sync'), None, None)),
+    ('stats', 'get', lambda owner, i: (reverse('stats'), None, None)),
+    ('users-list', 'get', lambda owner, i: (reverse('users-list'), None, None)),
+    ('users-detail', 'get', lambda owner, i: (reverse('users-detail', args=[owner['user'].id]), None, None)),
+    ('users-full', 'get', lambda owner, i: (reverse('users-full', args=[owner['user'].id]), None, None)),
+    ('todos-create', 'post', lambda owner, i: (
+        reverse('todos-list'), {'title': 'bench %d' % i, 'tag_list': []}, 'json')),
+    ('todos-update', 'patch', lambda owner, i: (
+        reverse('todos-detail', args=[owner['todos'][i % len(owner['todos'])]]), {'title': 'edited %d' % i}, 'json')),
+    ('tags-attach', 'post', lambda owner, i: (
+        reverse('tags-attach', args=[owner['tags'][-1]]), {'todos': _window(owner['todos'], i, 5)}, 'json')),
+    ('tags-detach', 'post', lambda owner, i: (
+        reverse('tags-detach', args=[owner['tags'][-1]]), {'todos': _window(owner['todos'], i, 5)}, 'json')),
+    ('todos-bulk', 'post', lambda owner, i: (reverse('todos-bulk'), {
+        'create': [{'title': 'bulk %d %d' % (i, n), 'tag_list': []} for n in range(10)],
+        'update': [{'id': todo_id, 'is_ended': True} for todo_id in _window(owner['todos'], i, 10)],
+    }, 'json')),
+    ('todos-import', 'post', lambda owner, i: (reverse('todos-import-file'), _import_file(owner, i), 'multipart')),
+    ('todos-destroy', 'delete', lambda owner, i: (
+        reverse('todos-detail', args=[owner['todos'][-1 - i % len(owner['todos'])]]), None, None)),
+]
+
+
+def count_rows(response):
+    """
+    Number of todos/tags/users a response carried.
+    """
+    if response.streaming:
+        return sum(chunk.count(b'\n') for chunk in response.streaming_content)
+    data = getattr(response, 'data', None)
+    if isinstance(data, list):
+        return len(data)
+    if not isinstance(data, dict):
+        return 0
+    if 'results' in data:
+        return len(data['results'])
+    if 'created' in data:
+        return len(data['created']) + len(data['updated']) + data['deleted']
+    if 'imported' in data:
+        return data['imported']
+    if 'todos' in data and 'tags' in data:
+        return len(data['todos']) + len(data['tags'])
+    return 1
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile of a sorted list.
+    """
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def run_scenario(context, name, method, build, requests, warmup):
+    client = APIClient()
+    timings = []
+    queries = 0
+    rows = 0
+    errors = 0
+    for i in range(warmup + requests):
+        owner = context[i % len(context)]
+        url, data, fmt = build(owner, i)
+        client.credentials(HTTP_AUTHORIZATION='Token ' + owner['token'])
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, data, format=fmt)
+            count = count_rows(response)
+            elapsed = time.perf_counter() - start
+        if i < warmup:
+            continue
+        timings.append(elapsed)
+        queries += len(ctx)
+        rows += count
+        errors += response.status_code >= 400
+    timings.sort()
+    total = sum(timings)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'mean_ms': round(total / requests * 1000, 3),
+        'queries_per_request': round(queries / requests, 2),
+        'rows_per_second': round(rows / total, 1) if total else 0.0,
+    }
+
+
+def run(users=5, todos=1000, tags=50, fan_out=3, requests=50, warmup=2, random_seed=0, only=None):
+    """
+    Seed the current database and run every scenario against it.
+    """
+    config = {
+        'users': users, 'todos': todos, 'tags': tags, 'fan_out': fan_out,
+        'requests': requests, 'warmup': warmup, 'seed': random_seed,
+    }
+    started = time.perf_counter()
+    context = seed(users, todos, tags, fan_out, random_seed)
+    seconds = time.perf_counter() - started
+    endpoints = {}
+    for name, method, build in SCENARIOS:
+        if only and name not in only:
+            continue
+        endpoints[name] = run_scenario(context, name, method, build, requests, warmup)
+    return {
+        'config': config,
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'seed_seconds': round(seconds, 3),
+        'endpoints': endpoints,
+    }
+
+
+def compare(result, baseline, threshold):
+    """
+    Return ``{endpoint: ratio}`` for endpoints whose p95 grew past ``threshold``.
+    """
+    regressions = {}
+    for name, current in result['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous or not previous['p95_ms']:
+            continue
+        ratio = current['p95_ms'] / previous['p95_ms']
+        if ratio > threshold:
+            regressions[name] = round(ratio, 2)
+    return regressions
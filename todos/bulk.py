@@ -0,0 +1,226 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+
+from . import stats
+from .cache import bump_version
+from .models import Todo, Tag
+
+TagLink = Todo.tag_list.through
+
+
+def link_tags(links):
+    """
+    Insert ``(todo_id, tags)`` pairs into the tag through table in one query.
+    """
+    TagLink.objects.bulk_create([
+        TagLink(todo_id=todo_id, tag_id=tag.id)
+        for todo_id, tags in links
+        for tag in tags
+    ])
+
+
+def live_todo_count():
+    """
+    Expression counting a tag's live todos, for ``Tag`` querysets.
+    """
+    return Coalesce(Subquery(
+        TagLink.objects.filter(tag_id=OuterRef('pk'), todo__deleted_at__isnull=True)
+        .order_by().values('tag_id').annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+def refresh_tag_counts(tag_ids):
+    """
+    Recount ``Tag.todo_count`` for ``tag_ids`` (ids or a ``values`` queryset)
+    with a single ``UPDATE``.
+
+    ``updated_at`` is stamped too, since the tag's ``todos`` changed.
+    """
+    return Tag.objects.filter(pk__in=tag_ids).update(
+        todo_count=live_todo_count(), updated_at=timezone.now()
+    )
+
+
+def resolve_tags(owner_id, names, create=False):
+    """
+    Map tag names to the owner's ``Tag`` rows with one ``IN`` query.
+
+    With ``create``, names that don't exist yet are inserted with a single
+    ``bulk_create``. When an owner has duplicate names the oldest tag wins.
+    """
+    names = set(names)
+    tags = {}
+    if not names:
+        return tags
+    for tag in Tag.objects.filter(owner_id=owner_id, name__in=names).order_by('created_at', 'id'):
+        tags.setdefault(tag.name, tag)
+    missing = names - tags.keys()
+    if create and missing:
+        created = Tag.objects.bulk_create([Tag(owner_id=owner_id, name=name) for name in sorted(missing)])
+        tags.update((tag.name, tag) for tag in created)
+    return tags
+
+
+def save_new_tags(tag_lists):
+    """
+    ``bulk_create`` the unsaved tags in ``tag_lists``, one row per name.
+
+    Returns the lists with every unsaved tag swapped for the saved one.
+    """
+    new = {}
+    for tags in tag_lists:
+        for tag in tags:
+            if tag.pk is None:
+                new.setdefault((tag.owner_id, tag.name), tag)
+    if new:
+        Tag.objects.bulk_create(new.values())
+    return [
+        [tag if tag.pk is not None else new[tag.owner_id, tag.name] for tag in tags]
+        for tags in tag_lists
+    ]
+
+
+def _send_todo_links_changed(action, todo, tag_ids):
+    m2m_changed.send(
+        sender=TagLink, instance=todo, action=action, reverse=True,
+        model=Tag, pk_set=set(tag_ids), using=todo._state.db,
+    )
+
+
+def set_tags(todo, tags):
+    """
+    Make ``tags`` the tags of ``todo`` with one diff against its links.
+
+    Unsaved tags are created first. Only the links that changed are deleted
+    or inserted, with the same ``m2m_changed`` signals as ``tag_list.set()``.
+    """
+    wanted = {tag.id for tag in save_new_tags([tags])[0]}
+    current = set(TagLink.objects.filter(todo_id=todo.id).values_list('tag_id', flat=True))
+    removed = current - wanted
+    added = wanted - current
+    if removed:
+        _send_todo_links_changed('pre_remove', todo, removed)
+        TagLink.objects.filter(todo_id=todo.id, tag_id__in=removed).delete()
+        _send_todo_links_changed('post_remove', todo, removed)
+    if added:
+        _send_todo_links_changed('pre_add', todo, added)
+        TagLink.objects.bulk_create([TagLink(todo_id=todo.id, tag_id=tag_id) for tag_id in added])
+        _send_todo_links_changed('post_add', todo, added)
+    getattr(todo, '_prefetched_objects_cache', {}).pop('tag_list', None)
+
+
+def create_todos(owner_id, items):
+    """
+    Create todos from validated ``TodoSerializer`` data with ``bulk_create``.
+    """
+    todos = []
+    tag_lists = []
+    for data in items:
+        data = dict(data)
+        tag_lists.append(data.pop('tag_list', []))
+        todos.append(Todo(owner_id=owner_id, **data))
+    tag_lists = save_new_tags(tag_lists)
+    Todo.objects.bulk_create(todos)
+    stats.apply(owner_id, [], [stats.todo_row(todo) for todo in todos])
+    link_tags(zip([todo.id for todo in todos], tag_lists))
+    refresh_tag_counts({tag.id for tags in tag_lists for tag in tags})
+    bump_version(owner_id)
+    return todos
+
+
+def update_todos(owner_id, changes):
+    """
+    Apply ``{todo_id: validated_data}`` partial updates with one ``bulk_update``.
+
+    Like ``TodoViewSet.perform_update``, ``end_date`` is stamped on every todo
+    whose update marks it as ended.
+    """
+    todos = Todo.objects.filter(owner_id=owner_id, id__in=changes).in_bulk()
+    old_rows = [stats.todo_row(todo) for todo in todos.values()]
+    now = timezone.now()
+    fields = {'updated_at'}
+    retagged = []
+    for todo_id, data in changes.items():
+        todo = todos[todo_id]
+        data = dict(data)
+        if 'tag_list' in data:
+            retagged.append((todo_id, data.pop('tag_list')))
+        if data.get('is_ended'):
+            data['end_date'] = now
+        for name, value in data.items():
+            setattr(todo, name, value)
+        fields.update(data)
+        todo.updated_at = now
+    Todo.objects.bulk_update(todos.values(), sorted(fields))
+    stats.apply(owner_id, old_rows, [stats.todo_row(todo) for todo in todos.values()])
+    if retagged:
+        todo_ids = [todo_id for todo_id, _ in retagged]
+        retagged = list(zip(todo_ids, save_new_tags([tags for _, tags in retagged])))
+        old_links = TagLink.objects.filter(todo_id__in=todo_ids)
+        tag_ids = set(old_links.values_list('tag_id', flat=True))
+        old_links.delete()
+        link_tags(retagged)
+        refresh_tag_counts(tag_ids | {tag.id for _, tags in retagged for tag in tags})
+    bump_version(owner_id)
+    return list(todos.values())
+
+
+def delete_todos(owner_id, ids):
+    """
+    Soft-delete the owner's todos in a single ``UPDATE``.
+    """
+    now = timezone.now()
+    todos = Todo.objects.filter(owner_id=owner_id, id__in=ids)
+    old_rows = list(todos.values('id', *stats.STAT_FIELDS))
+    deleted = todos.update(deleted_at=now, updated_at=now)
+    stats.apply(owner_id, old_rows, [])
+    # Only the owner's deleted todos; ids may name anyone's.
+    deleted_ids = [row['id'] for row in old_rows]
+    refresh_tag_counts(TagLink.objects.filter(todo_id__in=deleted_ids).values('tag_id'))
+    bump_version(owner_id)
+    return deleted
+
+
+def _send_tag_links_changed(action, tag, todo_ids):
+    m2m_changed.send(
+        sender=TagLink, instance=tag, action=action, reverse=False,
+        model=Todo, pk_set=set(todo_ids), using=tag._state.db,
+    )
+
+
+def attach_tag(tag, todo_ids):
+    """
+    Link ``tag`` to the owner's todos in ``todo_ids`` that don't have it yet.
+
+    Returns how many links were inserted.
+    """
+    new_ids = list(Todo.objects.filter(
+        owner_id=tag.owner_id,
+        id__in=todo_ids,
+    ).exclude(tag_list=tag).values_list('id', flat=True))
+    if new_ids:
+        _send_tag_links_changed('pre_add', tag, new_ids)
+        TagLink.objects.bulk_create([TagLink(tag_id=tag.id, todo_id=todo_id) for todo_id in new_ids])
+        _send_tag_links_changed('post_add', tag, new_ids)
+    return len(new_ids)
+
+
+def detach_tag(tag, todo_ids):
+    """
+    Unlink ``tag`` from those todos in ``todo_ids`` that have it, with a
+    single ``DELETE``.
+
+    Returns how many links were removed.
+    """
+    linked_ids = list(TagLink.objects.filter(
+        tag_id=tag.id,
+        todo_id__in=todo_ids,
+    ).values_list('todo_id', flat=True))
+    if not linked_ids:
+        return 0
+    _send_tag_links_changed('pre_remove', tag, linked_ids)
+    removed, _ = TagLink.objects.filter(tag_id=tag.id, todo_id__in=linked_ids).delete()
+    _send_tag_links_changed('post_remove', tag, linked_ids)
+    return removed
@@ -0,0 +1,129 @@
+import contextlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+from . import replicas
+
+VERSION_KEY = 'todos:version:%s'
+LIST_KEY = 'todos:list:%s:%s:%s'
+WRITTEN_KEY = 'todos:written:%s'
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'TODOS_LIST_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'TODOS_LIST_CACHE_TIMEOUT', 60)
+
+
+def _set_version(owner_id):
+    cache = get_cache()
+    cache.set(VERSION_KEY % owner_id, uuid.uuid4().hex, None)
+    if replicas.get_replicas():
+        # Until replicas have the write, pages are rebuilt from the primary.
+        cache.set(WRITTEN_KEY % owner_id, True, replicas.get_lag())
+
+
+def bump_version(owner_id):
+    """
+    Invalidate every cached list of ``owner_id``.
+
+    Inside a transaction the version is bumped again on commit, so a list
+    rebuilt from not-yet-committed data can't outlive the write.
+    """
+    _set_version(owner_id)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _set_version(owner_id))
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    """
+    Return this process' hit and miss counters.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def list_keys(view, request):
+    """
+    Return the owner's version key, the key of this list page and the key
+    marking a recent write by the owner.
+    """
+    owner_id = request.user.id
+    return (
+        VERSION_KEY % owner_id,
+        LIST_KEY % (owner_id, type(view).__name__, request.build_absolute_uri()),
+        WRITTEN_KEY % owner_id,
+    )
+
+
+def lookup(keys, cached):
+    """
+    Return ``(version, data)`` from a ``get_many(keys)`` result; ``data`` is
+    None unless a page was stored under the current version.
+    """
+    version_key, list_key, _ = keys
+    version = cached.get(version_key)
+    if version is not None and list_key in cached and cached[list_key][0] == version:
+        _count('hits')
+        return version, cached[list_key][1]
+    _count('misses')
+    return version, None
+
+
+def rebuilding(keys, cached):
+    """
+    Return the context to rebuild a missed page in: the primary database
+    while the owner's last write may not have reached the replicas, so a
+    stale page is never stored under the new version.
+    """
+    if keys[2] in cached:
+        return replicas.primary()
+    return contextlib.nullcontext()
+
+
+def new_version(cache, version_key):
+    version = uuid.uuid4().hex
+    if not cache.add(version_key, version, None):
+        version = cache.get(version_key)
+    return version
+
+
+class CachedListMixin:
+    """
+    Serve ``list()`` from the cache until the owner's version changes.
+
+    The version and the cached page are fetched with one ``get_many``; a
+    cached page is only used when it was stored under the current version.
+    """
+    def list(self, request, *args, **kwargs):
+        timeout = get_timeout()
+        if not timeout:
+            return super().list(request, *args, **kwargs)
+
+        cache = get_cache()
+        keys = list_keys(self, request)
+        cached = cache.get_many(keys)
+        version, data = lookup(keys, cached)
+        if data is not None:
+            return Response(data)
+        if version is None:
+            version = new_version(cache, keys[0])
+        with rebuilding(keys, cached):
+            response = super().list(request, *args, **kwargs)
+        cache.set(keys[1], (version, response.data), timeout)
+        return response
@@ -0,0 +1,106 @@
+"""
+SQLite backend tuned for a single-file production database.
+
+* Pragmas (WAL, ``synchronous``, ``busy_timeout``, cache and mmap sizes)
+  are applied on every new connection.
+* Transactions start with ``BEGIN IMMEDIATE`` so a writer takes the write
+  lock up front. With a deferred ``BEGIN`` a transaction that reads before
+  writing fails with "database is locked" at once when another writer got
+  there first: SQLite can't wait on a lock upgrade without deadlocking.
+* Statements and commits that still hit a lock are retried with
+  exponential backoff.
+
+Configure it with ``OPTIONS``, next to the usual ``sqlite3.connect()``
+arguments::
+
+    'ENGINE': 'todos.db.sqlite3',
+    'OPTIONS': {
+        'pragmas': {'cache_size': -64000},  # merged over PRAGMAS
+        'transaction_mode': 'IMMEDIATE',    # or 'DEFERRED' / 'EXCLUSIVE'
+        'lock_retries': 5,
+        'lock_retry_backoff': 0.01,         # seconds, doubled per attempt
+    }
+"""
+import random
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+from django.db.backends.sqlite3.base import Database
+
+PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,  # KiB
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def is_locked(exc):
+    return 'database is locked' in str(exc) or 'database table is locked' in str(exc)
+
+
+def retry_locked(func, retries, backoff):
+    """
+    Call ``func``, retrying while SQLite reports a lock, ``retries`` times.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except Database.OperationalError as exc:
+            if attempt == retries or not is_locked(exc):
+                raise
+            # Jitter keeps waiting writers from retrying in lockstep.
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+class SQLiteCursorWrapper(base.SQLiteCursorWrapper):
+    retries = 0
+    backoff = 0
+
+    def execute(self, query, params=None):
+        return retry_locked(lambda: super(SQLiteCursorWrapper, self).execute(query, params),
+                            self.retries, self.backoff)
+
+    def executemany(self, query, param_list):
+        # param_list may be a generator; materialize it so a retry replays it.
+        param_list = list(param_list)
+        return retry_locked(lambda: super(SQLiteCursorWrapper, self).executemany(query, param_list),
+                            self.retries, self.backoff)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **kwargs.pop('pragmas', {})}
+        self.transaction_mode = kwargs.pop('transaction_mode', 'IMMEDIATE').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                "DATABASES OPTIONS 'transaction_mode' must be one of %s." % ', '.join(TRANSACTION_MODES)
+            )
+        self.lock_retries = kwargs.pop('lock_retries', 5)
+        self.lock_retry_backoff = kwargs.pop('lock_retry_backoff', 0.01)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute('PRAGMA %s = %s' % (name, value))
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=SQLiteCursorWrapper)
+        cursor.retries = self.lock_retries
+        cursor.backoff = self.lock_retry_backoff
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN %s' % self.transaction_mode)
+
+    def _commit(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                retry_locked(self.connection.commit, self.lock_retries, self.lock_retry_backoff)
@@ -0,0 +1,55 @@
+import csv
+import io
+import itertools
+import json
+
+from django.conf import settings
+
+from .fast import FIELDS, render_todos, todo_values
+
+TAG_SEPARATOR = '|'
+
+
+def get_chunk_size():
+    return getattr(settings, 'TODOS_EXPORT_CHUNK_SIZE', 1000)
+
+
+def iter_todo_chunks(queryset, chunk_size=None):
+    """
+    Yield lists of rendered todos, ``chunk_size`` rows at a time.
+
+    Rows stream from ``QuerySet.iterator()``; each chunk's tags are fetched
+    with one query, so memory is bounded by the chunk, not the account.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    rows = todo_values(queryset.order_by('created_at', 'id')).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield render_todos(chunk)
+
+
+def iter_ndjson(queryset, chunk_size=None):
+    for chunk in iter_todo_chunks(queryset, chunk_size):
+        yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in chunk)
+
+
+def iter_csv(queryset, chunk_size=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    yield buffer.getvalue()
+    for chunk in iter_todo_chunks(queryset, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in chunk:
+            row['tag_list'] = TAG_SEPARATOR.join(row['tag_list'])
+            writer.writerow([row[field] for field in FIELDS])
+        yield buffer.getvalue()
+
+
+FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+    'csv': (iter_csv, 'text/csv'),
+}
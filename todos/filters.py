@@ -1,5 +1,35 @@
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import filters
 
+from .serializers import requested_fields
+
+
 class OwnerFilterBackend(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
-        return queryset.filter(owner=request.user)
\ No newline at end of file
+        return queryset.filter(owner_id=request.user.id)
+
+
+class SparseFieldsFilterBackend(filters.BaseFilterBackend):
+    """
+    Load only what ``?fields=`` asks for: defer unselected columns and drop
+    joins and prefetches for relations that won't be rendered.
+    """
+    def filter_queryset(self, request, queryset, view):
+        fields = requested_fields(request, view.get_serializer_class())
+        if fields is None:
+            return queryset
+        ordering = getattr(view.paginator, 'ordering', None) or ()
+        columns = {'id', 'owner'} | {order.lstrip('-') for order in ordering}
+        queryset = queryset.select_related(None).prefetch_related(None)
+        for name in fields:
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_many:
+                queryset = queryset.prefetch_related(name)
+            elif field.concrete:
+                columns.add(name)
+                if field.many_to_one:
+                    queryset = queryset.select_related(name)
+        return queryset.only(*columns)
@@ -0,0 +1,164 @@
+import csv
+import itertools
+import json
+
+from django.conf import settings
+from django.db import transaction
+
+from . import stats
+from .bulk import TagLink, refresh_tag_counts, resolve_tags
+from .cache import bump_version
+from .export import TAG_SEPARATOR
+from .models import Todo
+from .serializers import TodoImportSerializer
+
+NULLABLE_CSV_FIELDS = ('description', 'desired_end_date', 'end_date', 'is_ended')
+
+
+def get_batch_size():
+    return getattr(settings, 'TODOS_IMPORT_BATCH_SIZE', 500)
+
+
+def read_ndjson(lines):
+    """
+    Yield ``(line_number, data)`` for every non-blank NDJSON line.
+
+    ``data`` is the exception instead when the line can't be decoded.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            data = json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+            continue
+        if not isinstance(data, dict):
+            yield line_number, ValueError('Expected a JSON object.')
+            continue
+        yield line_number, data
+
+
+class DecodedLines:
+    """
+    Iterate ``lines`` as text, counting them. Undecodable lines are kept in
+    ``errors`` by line number and passed on with replacement characters.
+    """
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.line_num = 0
+        self.errors = {}
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.lines)
+        self.line_num += 1
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError as exc:
+                self.errors[self.line_num] = exc
+                line = line.decode('utf-8', 'replace')
+        return line
+
+
+def read_csv(lines):
+    """
+    Yield ``(line_number, data)`` for every CSV row, in the export layout.
+
+    ``data`` is the exception instead when the row can't be decoded or parsed.
+    """
+    lines = DecodedLines(lines)
+    reader = csv.DictReader(lines)
+    last_line = 0
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            row = exc
+        # A quoted field may span lines; any undecodable one spoils the row.
+        errors = [lines.errors.pop(n) for n in range(last_line + 1, lines.line_num + 1) if n in lines.errors]
+        last_line = lines.line_num
+        if errors:
+            row = errors[0]
+        if isinstance(row, Exception):
+            yield lines.line_num, row
+            continue
+        data = dict(row)
+        tag_list = data.get('tag_list')
+        data['tag_list'] = tag_list.split(TAG_SEPARATOR) if tag_list else []
+        for field in NULLABLE_CSV_FIELDS:
+            if data.get(field) == '':
+                data[field] = None
+        yield lines.line_num, data
+
+
+READERS = {
+    'ndjson': read_ndjson,
+    'csv': read_csv,
+}
+
+
+def write_batch(owner_id, items):
+    """
+    Insert one batch of validated todos, their tags and tag links.
+    """
+    names = {name for data in items for name in data.get('tag_list', [])}
+    with transaction.atomic():
+        tags = resolve_tags(owner_id, names, create=True)
+        todos = []
+        tag_lists = []
+        for data in items:
+            data = dict(data)
+            tag_lists.append([tags[name] for name in data.pop('tag_list', [])])
+            todos.append(Todo(owner_id=owner_id, **data))
+        Todo.objects.bulk_create(todos)
+        stats.apply(owner_id, [], [stats.todo_row(todo) for todo in todos])
+        TagLink.objects.bulk_create([
+            TagLink(todo_id=todo.id, tag_id=tag.id)
+            for todo, tag_list in zip(todos, tag_lists)
+            for tag in tag_list
+        ])
+        refresh_tag_counts({tag.id for tag in tags.values()})
+    bump_version(owner_id)
+
+
+def import_todos(owner_id, rows, batch_size=None, max_errors=100, on_progress=None):
+    """
+    Validate and insert ``(line_number, data)`` rows in fixed-size batches.
+
+    Each batch is committed on its own, so a failure only loses the batch in
+    flight. Returns a summary with the imported count and the first
+    ``max_errors`` per-row errors; ``on_progress`` gets it after every batch.
+    """
+    batch_size = batch_size or get_batch_size()
+    result = {'imported': 0, 'error_count': 0, 'errors': []}
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return result
+        items = []
+        for line_number, data in batch:
+            if isinstance(data, Exception):
+                errors = [str(data)]
+            else:
+                serializer = TodoImportSerializer(data=data)
+                if serializer.is_valid():
+                    items.append(serializer.validated_data)
+                    continue
+                errors = serializer.errors
+            result['error_count'] += 1
+            if len(result['errors']) < max_errors:
+                result['errors'].append({'line': line_number, 'errors': errors})
+        if items:
+            write_batch(owner_id, items)
+            result['imported'] += len(items)
+        if on_progress is not None:
+            on_progress(result)
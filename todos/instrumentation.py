@@ -0,0 +1,178 @@
+"""
+Per-request timing: SQL, authentication, serialization and rendering.
+
+``ServerTimingMiddleware`` (enabled by ``TODOS_SERVER_TIMING``) records
+every query and adds a ``Server-Timing`` header. Views that mix in
+``TimingMixin`` report where the rest of the time went; without the
+middleware the mixin does nothing.
+"""
+import asyncio
+import contextlib
+import contextvars
+import logging
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('todos.timing')
+
+_current = contextvars.ContextVar('todos_timings', default=None)
+
+
+class Timings:
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.queries = []
+        self.view_name = None
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - start, sql))
+
+    @property
+    def sql_time(self):
+        return sum(duration for duration, _ in self.queries)
+
+    def header(self, total):
+        metrics = [
+            'db;dur=%.1f;desc="%d queries"' % (self.sql_time * 1000, len(self.queries)),
+        ]
+        for name in ('auth', 'serialize', 'render'):
+            if name in self.durations:
+                metrics.append('%s;dur=%.1f' % (name, self.durations[name] * 1000))
+        metrics.append('total;dur=%.1f' % (total * 1000))
+        return ', '.join(metrics)
+
+
+@contextlib.contextmanager
+def measure(name):
+    """
+    Add the time spent in the block to the current request's ``name`` timing.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[name] += time.perf_counter() - start
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TODOS_SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function, as MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timings = Timings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with self.wrap_queries(timings):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            # Queries run in the request's sync thread, on that thread's connections.
+            stack = await sync_to_async(self.wrap_queries)(timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    def wrap_queries(self, timings):
+        stack = contextlib.ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timings.record_query))
+        return stack
+
+    def finish(self, request, response, timings, total):
+        response['Server-Timing'] = timings.header(total)
+        self.log_if_slow(request, timings, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view_name = getattr(view_func, '__qualname__', repr(view_func))
+
+    def log_if_slow(self, request, timings, total):
+        slow_ms = getattr(settings, 'TODOS_SLOW_REQUEST_MS', 500)
+        slow_queries = getattr(settings, 'TODOS_SLOW_REQUEST_QUERIES', 50)
+        if total * 1000 < slow_ms and len(timings.queries) < slow_queries:
+            return
+        slowest = sorted(timings.queries, key=lambda query: query[0], reverse=True)
+        logger.warning(
+            'Slow request %s %s (%s): %.1fms, %d queries in %.1fms; slowest: %s',
+            request.method, request.path, timings.view_name, total * 1000,
+            len(timings.queries), timings.sql_time * 1000,
+            ' | '.join('%.1fms %s' % (duration * 1000, sql) for duration, sql in
+                       slowest[:getattr(settings, 'TODOS_SLOW_REQUEST_LOG_QUERIES', 3)]),
+        )
+
+
+class TimingMixin:
+    """
+    Report authentication, serializer and render time of a DRF view.
+    """
+    def initial(self, request, *args, **kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view_name = '%s.%s' % (
+                type(self).__name__, getattr(self, 'action', None) or request.method.lower()
+            )
+        super().initial(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with measure('auth'):
+            super().perform_authentication(request)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if _current.get() is not None:
+            to_representation = serializer.to_representation
+
+            def timed(*args, **kwargs):
+                with measure('serialize'):
+                    return to_representation(*args, **kwargs)
+            serializer.to_representation = timed
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        timings = _current.get()
+        if timings is not None and hasattr(response, 'add_post_render_callback'):
+            # Django renders the response after the view returns.
+            start = time.perf_counter()
+
+            def rendered(response):
+                timings.durations['render'] += time.perf_counter() - start
+            response.add_post_render_callback(rendered)
+        return response
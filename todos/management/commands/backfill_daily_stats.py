@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from todos import stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailyStats rollups from the todo table, e.g. after raw bulk writes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Only rebuild this user\'s rollups.')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options['username']:
+            users = users.filter(username=options['username'])
+            if not users.exists():
+                raise CommandError('User "%s" does not exist.' % options['username'])
+        days = 0
+        for owner_id in users.values_list('id', flat=True).iterator():
+            days += stats.rebuild(owner_id)
+        self.stdout.write(self.style.SUCCESS('Rebuilt %d days of stats.' % days))
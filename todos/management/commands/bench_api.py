@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from todos import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and measure every todos API endpoint. '
+        'Prints p50/p95/p99 latency, queries per request and rows per second as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--todos', type=int, default=1000, help='Todos per user.')
+        parser.add_argument('--tags', type=int, default=50, help='Tags per user.')
+        parser.add_argument('--fan-out', type=int, default=3, help='Average tags per todo.')
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help='Only run these scenarios.')
+        parser.add_argument('--no-cache', action='store_true', help='Disable the list cache.')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+        parser.add_argument('--compare', help='Fail if p95 regressed against this earlier report.')
+        parser.add_argument('--threshold', type=float, default=1.25, help='Allowed p95 ratio for --compare.')
+
+    def handle(self, *args, **options):
+        names = {name for name, _, _ in benchmark.SCENARIOS}
+        unknown = set(options['endpoints'] or ()) - names
+        if unknown:
+            raise CommandError('Unknown endpoints: %s' % ', '.join(sorted(unknown)))
+        if options['todos'] < 1 or options['tags'] < 1 or options['users'] < 1 or options['requests'] < 1:
+            raise CommandError('--users, --todos, --tags and --requests must be positive.')
+
+        # Throttling would reject most of the measured requests.
+        overrides = {'TODOS_THROTTLE_RATES': {}}
+        if options['no_cache']:
+            overrides['TODOS_LIST_CACHE_TIMEOUT'] = 0
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(**overrides):
+                result = benchmark.run(
+                    users=options['users'],
+                    todos=options['todos'],
+                    tags=options['tags'],
+                    fan_out=options['fan_out'],
+                    requests=options['requests'],
+                    warmup=options['warmup'],
+                    random_seed=options['seed'],
+                    only=options['endpoints'],
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                result['regressions'] = benchmark.compare(result, json.load(baseline), options['threshold'])
+        report = json.dumps(result, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report + '\n')
+        self.stdout.write(report)
+        if result.get('regressions'):
+            raise CommandError('p95 regressed: %s' % ', '.join(
+                '%s x%s' % item for item in sorted(result['regressions'].items())
+            ))
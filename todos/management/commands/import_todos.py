@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from todos.importer import READERS, get_batch_size, import_todos
+
+
+class Command(BaseCommand):
+    help = 'Import todos and tags for a user from an NDJSON or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--type', choices=sorted(READERS), help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=get_batch_size())
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('User "%s" does not exist.' % options['username'])
+        kind = options['type'] or options['path'].rsplit('.', 1)[-1]
+        if kind not in READERS:
+            raise CommandError('Unknown file type "%s"; use --type.' % kind)
+
+        def report(result):
+            self.stdout.write('imported %(imported)d, errors %(error_count)d' % result)
+
+        with open(options['path'], encoding='utf-8', newline='') as lines:
+            result = import_todos(
+                owner.id,
+                READERS[kind](lines),
+                batch_size=options['batch_size'],
+                on_progress=report,
+            )
+        for error in result['errors']:
+            self.stderr.write('line %(line)d: %(errors)s' % error)
+        self.stdout.write(self.style.SUCCESS('Imported %d todos.' % result['imported']))
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from todos.fast import tag_names_by_todo
+from todos.models import ArchivedTodo, Todo
+
+ARCHIVED_FIELDS = (
+    'owner_id', 'title', 'description', 'created_at', 'updated_at',
+    'desired_end_date', 'end_date', 'is_ended', 'deleted_at',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Archive or hard-delete todos soft-deleted more than --days ago, in '
+        'short transactions. Safe to interrupt and re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--hard', action='store_true', help='Delete without archiving.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Seconds to sleep between batches so other writers get the lock.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timezone.timedelta(days=options['days'])
+        total = 0
+        while True:
+            ids = list(
+                Todo.all_objects.filter(deleted_at__lt=cutoff)
+                .order_by('deleted_at', 'id')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                if not options['hard']:
+                    archive(ids)
+                Todo.all_objects.filter(id__in=ids).delete()
+            total += len(ids)
+            self.stdout.write('%s %d todos' % ('deleted' if options['hard'] else 'archived', total))
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS('Purged %d todos.' % total))
+
+
+def archive(ids):
+    tag_names = tag_names_by_todo(ids)
+    ArchivedTodo.objects.bulk_create([
+        ArchivedTodo(todo_id=row['id'], tag_names=tag_names[row['id']], **{
+            field: row[field] for field in ARCHIVED_FIELDS
+        })
+        for row in Todo.all_objects.filter(id__in=ids).values('id', *ARCHIVED_FIELDS)
+    ], ignore_conflicts=True)
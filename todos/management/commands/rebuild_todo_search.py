@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from todos import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the todo full-text index and its triggers if they are missing '
+        'and reindex every todo.'
+    )
+
+    def handle(self, *args, **options):
+        if not search.is_supported(connection):
+            raise CommandError('Full-text search needs SQLite with FTS5.')
+        with transaction.atomic(), connection.cursor() as cursor:
+            search.install(cursor)
+            search.rebuild(cursor)
+        self.stdout.write(self.style.SUCCESS('Rebuilt the todo search index.'))
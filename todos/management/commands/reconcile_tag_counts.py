@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from todos.bulk import live_todo_count
+from todos.cache import bump_version
+from todos.models import Tag
+
+
+class Command(BaseCommand):
+    help = 'Recount Tag.todo_count from the tag links, e.g. after raw bulk writes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Only reconcile this user\'s tags.')
+
+    def handle(self, *args, **options):
+        tags = Tag.objects.all()
+        if options['username']:
+            try:
+                tags = tags.filter(owner=User.objects.get(username=options['username']))
+            except User.DoesNotExist:
+                raise CommandError('User "%s" does not exist.' % options['username'])
+        stale = tags.annotate(live_count=live_todo_count()).exclude(todo_count=F('live_count'))
+        owner_ids = set(stale.values_list('owner_id', flat=True))
+        fixed = Tag.objects.filter(pk__in=stale.values('pk')).update(todo_count=live_todo_count())
+        for owner_id in owner_ids:
+            bump_version(owner_id)
+        self.stdout.write(self.style.SUCCESS('Fixed %d tag counts.' % fixed))
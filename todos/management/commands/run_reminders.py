@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from todos.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver deadline reminders to TODOS_REMINDER_SINK. Sleeps until the next '
+        'reminder is due, waking at least every --max-sleep seconds to pick up edits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Deliver what is due now and exit.')
+        parser.add_argument('--max-sleep', type=float, default=30)
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler()
+        scheduler.start()
+        try:
+            while True:
+                delivered = scheduler.run_pending()
+                if delivered:
+                    self.stdout.write('delivered %d reminders' % delivered)
+                if options['once']:
+                    break
+                delay = (scheduler.next_wakeup() - timezone.now()).total_seconds()
+                time.sleep(min(max(delay, 0), options['max_sleep']))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scheduler.stop()
+        self.stdout.write(self.style.SUCCESS('Reminder worker stopped.'))
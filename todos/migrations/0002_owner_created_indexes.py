@@ -0,0 +1,32 @@
+# Generated by Django 4.0.3 on 2026-10-18 18:11
+
+from django.db import migrations, models
+import todos.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='background_color',
+            field=models.CharField(default=todos.models.random_color, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='text_color',
+            field=models.CharField(default=todos.models.random_color, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='tag_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='todo_owner_created_idx'),
+        ),
+    ]
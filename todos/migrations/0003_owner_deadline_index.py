@@ -0,0 +1,17 @@
+# Generated by Django 4.0.3 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0002_owner_created_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['owner', 'desired_end_date', 'id'], name='todo_owner_deadline_idx'),
+        ),
+    ]
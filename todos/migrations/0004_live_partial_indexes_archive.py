@@ -0,0 +1,58 @@
+# Generated by Django 4.0.3 on 2026-10-18 18:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todos', '0003_owner_deadline_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTodo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('todo_id', models.BigIntegerField(unique=True)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('tag_names', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('desired_end_date', models.DateTimeField(blank=True, null=True)),
+                ('end_date', models.DateTimeField(blank=True, null=True)),
+                ('is_ended', models.BooleanField(null=True)),
+                ('deleted_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='todo',
+            name='todo_owner_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='todo',
+            name='todo_owner_deadline_idx',
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['owner', 'created_at', 'id'], name='todo_live_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['owner', 'desired_end_date', 'id'], name='todo_live_owner_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='todo_deleted_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedtodo',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_todos', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
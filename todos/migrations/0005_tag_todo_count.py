@@ -0,0 +1,30 @@
+# Generated by Django 4.0.3 on 2026-10-18 18:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_todos(apps, schema_editor):
+    Tag = apps.get_model('todos', 'Tag')
+    TagLink = Tag.todos.through
+    Tag.objects.update(todo_count=Coalesce(Subquery(
+        TagLink.objects.filter(tag_id=OuterRef('pk'), todo__deleted_at__isnull=True)
+        .order_by().values('tag_id').annotate(count=Count('*')).values('count')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0004_live_partial_indexes_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='todo_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_todos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from todos import search
+
+
+def install(apps, schema_editor):
+    if search.is_supported(schema_editor.connection):
+        with schema_editor.connection.cursor() as cursor:
+            search.install(cursor)
+            search.rebuild(cursor)
+
+
+def uninstall(apps, schema_editor):
+    if search.is_supported(schema_editor.connection):
+        with schema_editor.connection.cursor() as cursor:
+            search.uninstall(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0005_tag_todo_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
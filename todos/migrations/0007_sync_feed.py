@@ -0,0 +1,26 @@
+# Generated by Django 4.0.3 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0006_todo_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='deleted_at',
+            field=models.DateTimeField(default=None, null=True, verbose_name='삭제일'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['owner', 'updated_at', 'id'], name='tag_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['owner', 'updated_at', 'id'], name='todo_owner_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.0.3 on 2026-10-18 18:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todos', '0007_sync_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('created', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('completed_late', models.IntegerField(default=0)),
+                ('lead_time_seconds', models.BigIntegerField(default=0)),
+                ('due', models.IntegerField(default=0)),
+                ('due_open', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystats',
+            constraint=models.UniqueConstraint(fields=('owner', 'date'), name='daily_stats_owner_date'),
+        ),
+    ]
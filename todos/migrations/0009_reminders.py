@@ -0,0 +1,55 @@
+# Generated by Django 4.0.3 on 2026-10-18 18:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todos', '0008_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('due_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['desired_end_date', 'id'], name='todo_live_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['updated_at', 'id'], name='todo_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='reminderoutbox',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='reminderoutbox',
+            name='todo',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='todos.todo'),
+        ),
+        migrations.AddIndex(
+            model_name='reminderoutbox',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['created_at', 'id'], name='reminder_outbox_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderoutbox',
+            constraint=models.UniqueConstraint(fields=('todo', 'due_at'), name='reminder_outbox_todo_due'),
+        ),
+    ]
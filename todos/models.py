@@ -15,17 +15,19 @@ class SoftDeletionManager(models.Manager):
 class SoftDeletionModel(models.Model):
     deleted_at = models.DateTimeField('삭제일', null=True, default=None)
     objects = SoftDeletionManager()
+    all_objects = models.Manager() # 삭제된 row 포함
 
     class Meta:
         abstract = True # 상속할 수 있게
 
+    # updated_at도 갱신해야 sync feed가 삭제/복구를 내려준다
     def delete(self, using=None, keep_parents=False):
         self.deleted_at = timezone.now()
-        self.save(update_fields=['deleted_at'])
+        self.save(update_fields=['deleted_at', 'updated_at'])
 
     def restore(self):
         self.deleted_at = None
-        self.save(update_fields=['deleted_at'])
+        self.save(update_fields=['deleted_at', 'updated_at'])
 
 
 class Todo(SoftDeletionModel):
@@ -40,6 +42,34 @@ class Todo(SoftDeletionModel):
 
     class Meta:
         ordering=['created_at']
+        indexes = [
+            # SoftDeletionManager always adds deleted_at IS NULL, so the hot
+            # lookups only need to index live rows.
+            models.Index(
+                fields=['owner', 'created_at', 'id'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='todo_live_owner_created_idx',
+            ),
+            models.Index(
+                fields=['owner', 'desired_end_date', 'id'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='todo_live_owner_deadline_idx',
+            ),
+            models.Index(
+                fields=['deleted_at'],
+                condition=models.Q(deleted_at__isnull=False),
+                name='todo_deleted_idx',
+            ),
+            # sync feed: 삭제된 row도 포함해야 하므로 partial index가 아님
+            models.Index(fields=['owner', 'updated_at', 'id'], name='todo_owner_updated_idx'),
+            # reminder worker: 전체 owner의 다가오는 마감과 최근 변경을 훑는다
+            models.Index(
+                fields=['desired_end_date', 'id'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='todo_live_deadline_idx',
+            ),
+            models.Index(fields=['updated_at', 'id'], name='todo_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -48,7 +78,70 @@ class Todo(SoftDeletionModel):
         now = timezone.now()
         return now - timezone.timedelta(days=3) <= self.desired_end_date <= now
 
-class Tag(models.Model):
+class ArchivedTodo(models.Model):
+    todo_id = models.BigIntegerField(unique=True)
+    owner = models.ForeignKey('auth.User', related_name='archived_todos', on_delete=models.CASCADE)
+    title = models.CharField(max_length=200)
+    description = models.TextField(null=True, blank=True)
+    tag_names = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    desired_end_date = models.DateTimeField(null=True, blank=True)
+    end_date = models.DateTimeField(null=True, blank=True)
+    is_ended = models.BooleanField(null=True)
+    deleted_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title
+
+class DailyStats(models.Model):
+    # owner별 하루 단위 집계. todos.stats가 todo 변경마다 증감시킨다
+    owner = models.ForeignKey('auth.User', related_name='daily_stats', on_delete=models.CASCADE)
+    date = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    completed_late = models.IntegerField(default=0) # desired_end_date 이후 완료
+    lead_time_seconds = models.BigIntegerField(default=0) # 완료된 todo의 (end_date - created_at) 합
+    due = models.IntegerField(default=0) # desired_end_date가 이 날인 todo
+    due_open = models.IntegerField(default=0) # 그 중 아직 안 끝난 todo
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'date'], name='daily_stats_owner_date'),
+        ]
+
+    def __str__(self):
+        return '%s %s' % (self.owner_id, self.date)
+
+class ReminderOutbox(models.Model):
+    # todos.reminders.OutboxSink가 쌓는 마감 알림. 다른 프로세스가 읽어서 보내고 sent_at을 채운다
+    owner = models.ForeignKey('auth.User', related_name='reminders', on_delete=models.CASCADE)
+    todo = models.ForeignKey(Todo, related_name='reminders', on_delete=models.CASCADE)
+    title = models.CharField(max_length=200)
+    due_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        constraints = [
+            # worker가 재시작해서 같은 알림을 다시 내도 한 번만 쌓인다
+            models.UniqueConstraint(fields=['todo', 'due_at'], name='reminder_outbox_todo_due'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(sent_at__isnull=True),
+                name='reminder_outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return '%s %s' % (self.todo_id, self.due_at)
+
+class Tag(SoftDeletionModel):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     owner = models.ForeignKey('auth.User', related_name='tags', on_delete=models.CASCADE)
@@ -56,9 +149,19 @@ class Tag(models.Model):
     name = models.CharField(max_length=50)
     text_color = models.CharField(max_length=50, default=random_color)
     background_color = models.CharField(max_length=50, default=random_color)
+    todo_count = models.PositiveIntegerField(default=0) # 삭제되지 않은 todo 수
 
     class Meta:
         ordering=['created_at']
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='tag_owner_created_idx'),
+            models.Index(fields=['owner', 'updated_at', 'id'], name='tag_owner_updated_idx'),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def delete(self, using=None, keep_parents=False):
+        # 살아있는 todo가 없을 때만 지워지므로, 삭제된 todo와의 연결만 정리된다
+        self.todos.through.objects.filter(tag_id=self.pk).delete()
+        super().delete(using, keep_parents)
\ No newline at end of file
@@ -0,0 +1,139 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination keyed on every field of ``ordering``.
+
+    DRF's cursor only filters on the first ordering field and skips ties with
+    an offset. Here the cursor position carries the whole key (``created_at``
+    plus ``id`` as tie-breaker), so each page is one range scan on the
+    ``(owner, created_at, id)`` index no matter how deep the client pages.
+    """
+    ordering = ('created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    position_separator = '|'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the unevaluated queryset for the requested page.
+
+        Split from ``set_page`` so async views can evaluate it themselves.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (self.reverse, self.current_position) = (False, None)
+        else:
+            (self.reverse, self.current_position) = (self.cursor.reverse, self.cursor.position)
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.current_position is not None:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(self.current_position, self.reverse))
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+
+        # Positions are unique, so the cursor offset is always zero.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Take the rows fetched by ``get_page_queryset`` and return the page.
+        """
+        current_position = self.current_position
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Build ``(a, b) > (x, y)`` as ``a > x OR (a = x AND b > y)``.
+        """
+        values = position.split(self.position_separator)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        keyset = Q()
+        equal = {}
+        for order, value in zip(self.ordering, values):
+            field_name = order.lstrip('-')
+            descending = order.startswith('-') != reverse
+            lookup = field_name + ('__lt' if descending else '__gt')
+            keyset |= Q(**equal, **{lookup: value})
+            equal[field_name] = value
+        return keyset
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            if isinstance(instance, dict):
+                values.append(str(instance[field_name]))
+            else:
+                values.append(str(getattr(instance, field_name)))
+        return self.position_separator.join(values)
+
+
+class UserCursorPagination(KeysetCursorPagination):
+    ordering = ('date_joined', 'id')
+
+
+class DeadlineCursorPagination(KeysetCursorPagination):
+    ordering = ('desired_end_date', 'id')
+
+
+class SearchPagination(PageNumberPagination):
+    """
+    Page numbers for ranked search results, which have no stable keyset.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -2,4 +2,4 @@ from rest_framework import permissions
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
\ No newline at end of file
+        return obj.owner_id == request.user.id
\ No newline at end of file
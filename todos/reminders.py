@@ -0,0 +1,242 @@
+"""
+Deadline reminders for ``manage.py run_reminders``.
+
+``ReminderScheduler`` keeps a heap of the open todos whose reminder
+(``desired_end_date`` minus ``TODOS_REMINDER_LEAD_MINUTES``) falls within
+the next ``TODOS_REMINDER_WINDOW_MINUTES``; the window is loaded from the
+deadline index a slice at a time as it moves forward. Edits reach the heap
+through the ``post_save``/``post_delete`` signals when they happen in the
+worker's process, and through a poll of recently updated todos otherwise.
+Due reminders go to the ``TODOS_REMINDER_SINK`` in batches, at least once:
+a restarted worker may repeat reminders that were due before it stopped.
+A batch the sink fails on is logged and requeued, after
+``TODOS_REMINDER_RETRY_SECONDS`` doubled per consecutive failure.
+"""
+import datetime
+import heapq
+import json
+import logging
+import urllib.parse
+import urllib.request
+import weakref
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ReminderOutbox, Todo
+
+logger = logging.getLogger('todos.reminders')
+
+# Re-read todos updated this long before the last poll, so rows committed
+# late by a slow transaction are not missed.
+SYNC_OVERLAP = datetime.timedelta(seconds=5)
+
+# Longest wait before retrying a batch the sink failed on.
+MAX_RETRY_DELAY = datetime.timedelta(hours=1)
+
+# Schedulers running in this process, for the signal receivers.
+_running = weakref.WeakSet()
+
+
+class LogSink:
+    def deliver(self, reminders):
+        for reminder in reminders:
+            logger.info('Todo %(todo_id)s of user %(owner_id)s is due at %(due_at)s: %(title)s', reminder)
+
+
+class WebhookSink:
+    """
+    POST each batch as JSON to ``TODOS_REMINDER_WEBHOOK_URL``.
+    """
+    def __init__(self, url=None, timeout=5):
+        self.url = url or getattr(settings, 'TODOS_REMINDER_WEBHOOK_URL', None)
+        parts = urllib.parse.urlsplit(self.url or '')
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            raise ImproperlyConfigured('TODOS_REMINDER_WEBHOOK_URL must be an http(s) URL, not %r.' % self.url)
+        self.timeout = timeout
+
+    def deliver(self, reminders):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({'reminders': reminders}, cls=DjangoJSONEncoder).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class OutboxSink:
+    """
+    Queue reminders as ``ReminderOutbox`` rows for another process to send.
+    """
+    def deliver(self, reminders):
+        ReminderOutbox.objects.bulk_create([
+            ReminderOutbox(
+                owner_id=reminder['owner_id'], todo_id=reminder['todo_id'],
+                title=reminder['title'], due_at=reminder['due_at'],
+            )
+            for reminder in reminders
+        ], ignore_conflicts=True)
+
+
+def get_sink():
+    return import_string(getattr(settings, 'TODOS_REMINDER_SINK', 'todos.reminders.LogSink'))()
+
+
+def _minutes(name, default):
+    return datetime.timedelta(minutes=getattr(settings, name, default))
+
+
+class ReminderScheduler:
+    def __init__(self, sink=None, lead=None, window=None, batch_size=None, retry=None):
+        self.sink = sink or get_sink()
+        self.lead = lead if lead is not None else _minutes('TODOS_REMINDER_LEAD_MINUTES', 60)
+        self.window = window if window is not None else _minutes('TODOS_REMINDER_WINDOW_MINUTES', 60)
+        self.batch_size = batch_size or getattr(settings, 'TODOS_REMINDER_BATCH_SIZE', 100)
+        if retry is None:
+            retry = datetime.timedelta(seconds=getattr(settings, 'TODOS_REMINDER_RETRY_SECONDS', 30))
+        self.retry = retry
+        self.failures = 0  # consecutive batches the sink failed on
+        self.heap = []  # (remind_at, todo_id, due_at); superseded entries are skipped on pop
+        self.scheduled = {}  # todo_id -> due_at of its live heap entry
+        self.sent = {}  # todo_id -> due_at already delivered, until the deadline passes
+        self.now = None
+        self.loaded_until = None
+        self.synced_at = None
+
+    def start(self, now=None):
+        self.now = now or timezone.now()
+        self.loaded_until = self.now
+        self.synced_at = self.now
+        self.load()
+        _running.add(self)
+
+    def stop(self):
+        _running.discard(self)
+
+    def load(self):
+        """
+        Load deadlines up to ``window`` past the next reminder time.
+        """
+        until = self.now + self.lead + self.window
+        if until <= self.loaded_until:
+            return
+        rows = (
+            Todo.objects.filter(desired_end_date__gt=self.loaded_until, desired_end_date__lte=until)
+            .exclude(is_ended=True)
+            .order_by('desired_end_date', 'id')
+            .values_list('id', 'desired_end_date')
+        )
+        self.loaded_until = until
+        for todo_id, due_at in rows.iterator():
+            self.track(todo_id, due_at)
+
+    def sync(self):
+        """
+        Apply edits made by other processes since the last poll.
+        """
+        since = self.synced_at - SYNC_OVERLAP
+        self.synced_at = self.now
+        rows = Todo.all_objects.filter(updated_at__gt=since).order_by().values_list(
+            'id', 'desired_end_date', 'is_ended', 'deleted_at'
+        )
+        for todo_id, due_at, is_ended, deleted_at in rows.iterator():
+            self.track(todo_id, None if is_ended or deleted_at else due_at)
+
+    def track(self, todo_id, due_at):
+        """
+        (Re)schedule ``todo_id`` for ``due_at``; ``None`` cancels it.
+        """
+        if due_at is None or due_at <= self.now or due_at > self.loaded_until:
+            self.scheduled.pop(todo_id, None)
+            return
+        if self.scheduled.get(todo_id) == due_at or self.sent.get(todo_id) == due_at:
+            return
+        self.scheduled[todo_id] = due_at
+        heapq.heappush(self.heap, (due_at - self.lead, todo_id, due_at))
+
+    def pop_due(self):
+        """
+        Take up to ``batch_size`` due entries off the heap, as todo_id -> due_at.
+        """
+        due = {}
+        while self.heap and self.heap[0][0] <= self.now and len(due) < self.batch_size:
+            _, todo_id, due_at = heapq.heappop(self.heap)
+            if self.scheduled.get(todo_id) != due_at:
+                continue
+            del self.scheduled[todo_id]
+            due[todo_id] = due_at
+        return due
+
+    def deliver(self, due):
+        # One query per batch; rows changed since they were scheduled are dropped.
+        rows = Todo.objects.filter(id__in=list(due)).exclude(is_ended=True).values('id', 'owner_id', 'title', 'desired_end_date')
+        reminders = [
+            {'todo_id': row['id'], 'owner_id': row['owner_id'], 'title': row['title'],
+             'due_at': row['desired_end_date']}
+            for row in rows if row['desired_end_date'] == due[row['id']]
+        ]
+        if not reminders:
+            return 0
+        try:
+            self.sink.deliver(reminders)
+        except Exception:
+            self.failures += 1
+            delay = min(self.retry * 2 ** (self.failures - 1), MAX_RETRY_DELAY)
+            logger.exception('Reminder sink failed on %d reminders; retrying in %s', len(reminders), delay)
+            self.requeue(reminders, self.now + delay)
+            return 0
+        self.failures = 0
+        for reminder in reminders:
+            self.sent[reminder['todo_id']] = reminder['due_at']
+        return len(reminders)
+
+    def requeue(self, reminders, remind_at):
+        for reminder in reminders:
+            todo_id, due_at = reminder['todo_id'], reminder['due_at']
+            if todo_id not in self.scheduled:
+                self.scheduled[todo_id] = due_at
+                heapq.heappush(self.heap, (remind_at, todo_id, due_at))
+
+    def run_pending(self, now=None):
+        """
+        Deliver everything due by ``now``; return the number delivered.
+        """
+        self.now = now or timezone.now()
+        self.sent = {todo_id: due_at for todo_id, due_at in self.sent.items() if due_at > self.now}
+        self.sync()
+        self.load()
+        delivered = 0
+        while True:
+            due = self.pop_due()
+            if not due:
+                return delivered
+            delivered += self.deliver(due)
+
+    def next_wakeup(self):
+        """
+        When the next reminder is due, or the window needs loading further.
+        """
+        while self.heap and self.scheduled.get(self.heap[0][1]) != self.heap[0][2]:
+            heapq.heappop(self.heap)
+        wakeup = self.loaded_until - self.lead
+        if self.heap:
+            wakeup = min(wakeup, self.heap[0][0])
+        return wakeup
+
+
+def todo_changed(todo):
+    for scheduler in list(_running):
+        if todo.is_ended or todo.deleted_at is not None:
+            scheduler.track(todo.pk, None)
+        else:
+            scheduler.track(todo.pk, todo.desired_end_date)
+
+
+def todo_deleted(todo):
+    for scheduler in list(_running):
+        scheduler.track(todo.pk, None)
@@ -0,0 +1,106 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` lets safe-method requests read from one of the
+``TODOS_READ_REPLICAS`` aliases; everything else (unsafe methods, commands,
+shells) reads from the primary. The first write in a request pins the rest
+of that request to the primary, so it reads its own writes. Replicas are
+assumed to catch up within ``TODOS_REPLICA_LAG_SECONDS``; code that must
+not read older data than that, like the list cache, uses ``primary()``.
+"""
+import asyncio
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# None outside requests; otherwise {'replica': bool, 'pinned': bool}.
+_state = contextvars.ContextVar('todos_replica_state', default=None)
+
+
+def get_replicas():
+    return getattr(settings, 'TODOS_READ_REPLICAS', [])
+
+
+def get_lag():
+    return getattr(settings, 'TODOS_REPLICA_LAG_SECONDS', 5)
+
+
+@contextmanager
+def primary():
+    """
+    Read from the primary inside the block.
+    """
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    pinned = state['pinned']
+    state['pinned'] = True
+    try:
+        yield
+    finally:
+        state['pinned'] = pinned
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _state.set({'replica': request.method in SAFE_METHODS, 'pinned': False})
+        try:
+            return self.get_response(request)
+        finally:
+            _state.reset(token)
+
+    async def __acall__(self, request):
+        token = _state.set({'replica': request.method in SAFE_METHODS, 'pinned': False})
+        try:
+            return await self.get_response(request)
+        finally:
+            _state.reset(token)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        replicas = get_replicas()
+        if not replicas or state is None or not state['replica'] or state['pinned']:
+            return None
+        # Reads inside a transaction on the primary must see its writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state['pinned'] = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        if db in get_replicas():
+            return False
+        return None
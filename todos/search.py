@@ -0,0 +1,96 @@
+"""
+Full-text search over todo titles and descriptions.
+
+On SQLite an external-content FTS5 table (``todos_todo_fts``) indexes
+``todos_todo`` and is kept in sync by triggers, so raw ``UPDATE``s and
+``bulk_create`` are covered too. Owner and soft-delete scoping happen on
+``todos_todo``; the FTS table only yields matching row ids and their rank.
+
+Rebuilding ``todos_todo`` (e.g. an ``AlterField`` on SQLite) drops the
+triggers, so such migrations must call ``install()`` again.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABLE = 'todos_todo_fts'
+
+INSTALL_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todos_todo_fts USING fts5("
+    "title, description, content='todos_todo', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS todos_todo_fts_ai AFTER INSERT ON todos_todo BEGIN "
+    "INSERT INTO todos_todo_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_todo_fts_ad AFTER DELETE ON todos_todo BEGIN "
+    "INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_todo_fts_au AFTER UPDATE OF title, description ON todos_todo BEGIN "
+    "INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO todos_todo_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+UNINSTALL_SQL = [
+    'DROP TRIGGER IF EXISTS todos_todo_fts_au',
+    'DROP TRIGGER IF EXISTS todos_todo_fts_ad',
+    'DROP TRIGGER IF EXISTS todos_todo_fts_ai',
+    'DROP TABLE IF EXISTS todos_todo_fts',
+]
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(cursor):
+    for sql in INSTALL_SQL:
+        cursor.execute(sql)
+
+
+def uninstall(cursor):
+    for sql in UNINSTALL_SQL:
+        cursor.execute(sql)
+
+
+def rebuild(cursor):
+    """
+    Reindex every row of ``todos_todo``.
+    """
+    cursor.execute("INSERT INTO todos_todo_fts(todos_todo_fts) VALUES ('rebuild')")
+
+
+def match_expression(query):
+    """
+    Turn user input into an FTS5 query: every word must match as a prefix.
+
+    Only word characters are kept and each word is quoted, so FTS5 operators
+    in the input can't raise a syntax error. Returns ``''`` when there is
+    nothing to search for.
+    """
+    return ' '.join('"%s"*' % word for word in re.findall(r'\w+', query))
+
+
+def search_todos(queryset, query):
+    """
+    Filter ``queryset`` to todos matching ``query``, best match first.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not is_supported(connections[queryset.db]):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(description__icontains=query)
+        ).order_by('created_at', 'id')
+    return queryset.filter(
+        id__in=RawSQL('SELECT rowid FROM todos_todo_fts WHERE todos_todo_fts MATCH %s', (expression,))
+    ).annotate(
+        # bm25: lower is better; title hits weigh more than description hits.
+        rank=RawSQL(
+            'SELECT bm25(todos_todo_fts, 10.0, 1.0) FROM todos_todo_fts '
+            'WHERE todos_todo_fts MATCH %s AND rowid = todos_todo.id',
+            (expression,),
+        ),
+    ).order_by('rank', 'id')
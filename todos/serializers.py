@@ -1,25 +1,139 @@
+import datetime
+from collections import Counter
+
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.utils import timezone
 from rest_framework.authtoken.models import Token
-from rest_framework import serializers
+from rest_framework import permissions, serializers
+from rest_framework.fields import empty
+from rest_framework.utils import html
+from rest_framework_simplejwt.tokens import RefreshToken
 from djoser.serializers import UserCreatePasswordRetypeSerializer
+from . import bulk
 from .models import Todo, Tag
 
 
-class TagSerializer(serializers.ModelSerializer):
+def requested_fields(request, serializer_class):
+    """
+    Return the field names picked with ``?fields=`` (plus ``?expand=``), or
+    None when the full representation was asked for.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    selected = {name.strip() for name in fields.split(',')}
+    for name in request.query_params.get('expand', '').split(','):
+        if name.strip() in serializer_class.expandable_fields:
+            selected.add(serializer_class.expandable_fields[name.strip()])
+    return selected
+
+
+class SparseFieldsMixin:
+    # ?expand= name -> field, only emitted with ?fields= when expanded
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = requested_fields(self.context.get('request'), type(self))
+        if selected is not None:
+            for name in list(self.fields):
+                if name not in selected:
+                    self.fields.pop(name)
+
+
+class TagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
+    expandable_fields = {'todos': 'todos'}
+
     class Meta:
         model = Tag
-        fields='__all__'
+        # Tags are only deleted through Tag.delete(), which checks for live todos.
+        exclude = ('deleted_at',)
+        read_only_fields = ('todo_count',)
+
+
+class DeadlineWindowSerializer(serializers.Serializer):
+    # 'from' is a keyword, so the query parameter fields are declared here.
+    def get_fields(self):
+        return {
+            'from': serializers.DateTimeField(required=False),
+            'to': serializers.DateTimeField(required=False),
+            'overdue': serializers.BooleanField(required=False),
+            'is_ended': serializers.BooleanField(required=False),
+        }
+
+    def validate(self, data):
+        if 'from' in data and 'to' in data and data['from'] > data['to']:
+            raise serializers.ValidationError('"from" must not be after "to".')
+        return data
+
+
+class StatsRangeSerializer(serializers.Serializer):
+    # Defaults to the last 30 days; longer ranges are capped at a year.
+    MAX_DAYS = 366
+    DEFAULT_DAYS = 30
+
+    def get_fields(self):
+        return {
+            'from': serializers.DateField(required=False),
+            'to': serializers.DateField(required=False),
+        }
+
+    def validate(self, data):
+        end = data.get('to') or timezone.localdate()
+        start = data.get('from') or end - datetime.timedelta(days=self.DEFAULT_DAYS - 1)
+        if start > end:
+            raise serializers.ValidationError('"from" must not be after "to".')
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError('Ask for at most %d days.' % self.MAX_DAYS)
+        return {'from': start, 'to': end}
 
 
-class TodoSerializer(serializers.ModelSerializer):
+class TagTodoIdsSerializer(serializers.Serializer):
+    todos = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+
+class TagNamesField(serializers.ListField):
+    """
+    A todo's tags by name, resolved against the requesting owner's tags.
+
+    All names are looked up with one ``IN`` query. Unknown names are an
+    error unless ``TODOS_CREATE_MISSING_TAGS`` is set, in which case they
+    come back as unsaved ``Tag`` objects for the write path to create.
+    """
+    child = serializers.CharField(max_length=50)
+
+    def get_value(self, dictionary):
+        # Like ManyRelatedField: an HTML form without the field means no tags.
+        if html.is_html_input(dictionary) and self.field_name not in dictionary:
+            return empty if getattr(self.root, 'partial', False) else []
+        return super().get_value(dictionary)
+
+    def get_attribute(self, instance):
+        return instance.tag_list.all()
+
+    def to_representation(self, tags):
+        return [tag.name for tag in tags]
+
+    def to_internal_value(self, data):
+        names = list(dict.fromkeys(super().to_internal_value(data)))
+        owner_id = self.context['request'].user.id
+        tags = bulk.resolve_tags(owner_id, names)
+        missing = [name for name in names if name not in tags]
+        if missing and not getattr(settings, 'TODOS_CREATE_MISSING_TAGS', False):
+            raise serializers.ValidationError('Tags not found: %s' % ', '.join(missing))
+        return [tags.get(name) or Tag(owner_id=owner_id, name=name) for name in names]
+
+
+class TodoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
-    tag_list = serializers.SlugRelatedField(
-        many=True,
-        queryset = Tag.objects.all(),
-        slug_field='name'
-    )
+    expandable_fields = {'tags': 'tag_list'}
+    tag_list = TagNamesField()
+
     class Meta:
         model = Todo
         fields=(
@@ -36,6 +150,66 @@ class TodoSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('end_date',)
 
+    def create(self, validated_data):
+        tags = validated_data.pop('tag_list', [])
+        todo = super().create(validated_data)
+        bulk.set_tags(todo, tags)
+        return todo
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tag_list', None)
+        todo = super().update(instance, validated_data)
+        if tags is not None:
+            bulk.set_tags(todo, tags)
+        return todo
+
+
+class TodoImportSerializer(serializers.ModelSerializer):
+    tag_list = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        required=False,
+    )
+
+    class Meta:
+        model = Todo
+        fields = (
+            'tag_list',
+            'title',
+            'description',
+            'desired_end_date',
+            'end_date',
+            'is_ended',
+        )
+
+    def validate_tag_list(self, value):
+        # A repeated name would link the todo to the same tag twice.
+        return list(dict.fromkeys(value))
+
+
+class TodoBulkSerializer(serializers.Serializer):
+    create = TodoSerializer(many=True, required=False)
+    update = serializers.ListField(child=serializers.DictField(), required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate_update(self, value):
+        ids = [item.get('id') for item in value]
+        # bool is an int subclass, but true is not todo 1.
+        if not all(type(todo_id) is int for todo_id in ids):
+            raise serializers.ValidationError('Every update needs an integer id.')
+        duplicates = sorted(todo_id for todo_id, count in Counter(ids).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError('Todos updated more than once: %s' % duplicates)
+        found = set(Todo.objects.filter(
+            owner_id=self.context['request'].user.id,
+            id__in=ids,
+        ).values_list('id', flat=True))
+        missing = [todo_id for todo_id in ids if todo_id not in found]
+        if missing:
+            raise serializers.ValidationError('Todos not found: %s' % missing)
+        serializer = TodoSerializer(data=value, many=True, partial=True, context=self.context)
+        serializer.is_valid(raise_exception=True)
+        return dict(zip(ids, serializer.validated_data))
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model=User
@@ -49,10 +223,34 @@ class UserWithTokenSerializer(UserCreatePasswordRetypeSerializer):
 
     def get_auth_token(self, obj):
         return str(Token.objects.get_or_create(user=obj)[0])
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if getattr(settings, 'TODOS_JWT_SIGNUP', False):
+            refresh = RefreshToken.for_user(instance)
+            data['jwt'] = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        return data
             
 
 
 
+class UserSummarySerializer(serializers.ModelSerializer):
+    # Annotated by UserViewSet.get_queryset().
+    todo_count = serializers.IntegerField(read_only=True)
+    completed_count = serializers.IntegerField(read_only=True)
+    tag_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = (
+            'id',
+            'username',
+            'todo_count',
+            'completed_count',
+            'tag_count',
+            )
+
+
 class UserTodoTagSerializer(serializers.ModelSerializer):
     todos = serializers.SlugRelatedField(
         many=True,
@@ -0,0 +1,133 @@
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache, reminders, stats
+from .bulk import TagLink, refresh_tag_counts
+from .models import Todo, Tag
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Todo)
+@receiver(post_delete, sender=Tag)
+def invalidate_owner_lists(sender, instance, **kwargs):
+    # SoftDeletionModel.delete()/restore() save, so they land here too.
+    cache.bump_version(instance.owner_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_lists(sender, instance, **kwargs):
+    # 'owner' in the serialized lists is the username.
+    cache.bump_version(instance.id)
+
+
+@receiver(m2m_changed, sender=Tag.todos.through)
+def invalidate_tagged_lists(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache.bump_version(instance.owner_id)
+
+
+@receiver(post_save, sender=Todo)
+def count_deleted_todo(sender, instance, update_fields=None, **kwargs):
+    # delete()/restore() only save deleted_at; recounting instead of +-1
+    # keeps a repeated delete() or restore() from skewing the count.
+    if update_fields and 'deleted_at' in update_fields:
+        refresh_tag_counts(TagLink.objects.filter(todo_id=instance.pk).values('tag_id'))
+
+
+@receiver(m2m_changed, sender=Tag.todos.through)
+def count_tagged_todos(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        # pk_set only holds links that were actually inserted.
+        if reverse:
+            if instance.deleted_at is None:
+                Tag.objects.filter(pk__in=pk_set).update(
+                    todo_count=F('todo_count') + 1, updated_at=timezone.now()
+                )
+        else:
+            added = Todo.objects.filter(pk__in=pk_set).count()
+            Tag.objects.filter(pk=instance.pk).update(
+                todo_count=F('todo_count') + added, updated_at=timezone.now()
+            )
+    elif action == 'post_remove':
+        # pk_set may name todos/tags that weren't linked, so recount.
+        refresh_tag_counts(pk_set if reverse else [instance.pk])
+    elif action == 'pre_clear' and reverse:
+        instance._cleared_tag_ids = list(instance.tag_list.values_list('id', flat=True))
+    elif action == 'post_clear':
+        refresh_tag_counts(instance.__dict__.pop('_cleared_tag_ids', []) if reverse else [instance.pk])
+
+
+@receiver(m2m_changed, sender=Tag.todos.through)
+def touch_retagged_todos(sender, instance, action, reverse, pk_set, **kwargs):
+    # tag_list is part of a todo's representation, so the sync feed has to
+    # see the todo as changed.
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_todo_ids = list(sender.objects.filter(tag_id=instance.pk).values_list('todo_id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        now = timezone.now()
+        if reverse:
+            instance.updated_at = now
+            todo_ids = [instance.pk]
+        elif action == 'post_clear':
+            todo_ids = instance.__dict__.pop('_cleared_todo_ids', [])
+        else:
+            todo_ids = pk_set
+        Todo.all_objects.filter(pk__in=todo_ids).update(updated_at=now)
+
+
+@receiver(pre_save, sender=Tag)
+def check_renamed_tag(sender, instance, update_fields=None, **kwargs):
+    renamed = False
+    if instance.pk is not None and (update_fields is None or 'name' in update_fields):
+        renamed = not Tag.all_objects.filter(pk=instance.pk, name=instance.name).exists()
+    instance._renamed = renamed
+
+
+@receiver(post_save, sender=Tag)
+def touch_renamed_tag_todos(sender, instance, **kwargs):
+    # Todos render their tags by name.
+    if instance.__dict__.pop('_renamed', False):
+        Todo.all_objects.filter(tag_list=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Todo)
+def remember_stat_fields(sender, instance, update_fields=None, **kwargs):
+    instance._stat_row = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(stats.STAT_FIELDS):
+        instance._stat_row = False
+        return
+    instance._stat_row = Todo.all_objects.filter(pk=instance.pk).values(*stats.STAT_FIELDS).first()
+
+
+@receiver(post_save, sender=Todo)
+def update_daily_stats(sender, instance, update_fields=None, **kwargs):
+    old = instance.__dict__.pop('_stat_row', None)
+    if old is False:
+        return
+    new = stats.todo_row(instance)
+    if old is not None and update_fields is not None:
+        # Fields outside update_fields weren't written; keep the stored ones.
+        new = {**old, **{field: new[field] for field in update_fields if field in new}}
+    stats.apply(instance.owner_id, [old] if old else [], [new])
+
+
+@receiver(post_delete, sender=Todo)
+def remove_daily_stats(sender, instance, **kwargs):
+    stats.apply(instance.owner_id, [stats.todo_row(instance)], [])
+
+
+@receiver(post_save, sender=Todo)
+def reschedule_reminder(sender, instance, **kwargs):
+    # Soft deletes are saves too.
+    reminders.todo_changed(instance)
+
+
+@receiver(post_delete, sender=Todo)
+def cancel_reminder(sender, instance, **kwargs):
+    reminders.todo_deleted(instance)
@@ -0,0 +1,137 @@
+"""
+Per-owner daily productivity rollups.
+
+Each live todo contributes to a few ``DailyStats`` cells: ``created`` on its
+creation day, ``completed`` (plus lead time, and ``completed_late``) on the
+day it ended, ``due``/``due_open`` on its deadline day. A write applies
+the difference between the todo's old and new contributions with ``F()``
+updates, so dashboards never rescan a user's history.
+"""
+import datetime
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DailyStats, Todo
+
+# Todo columns the rollup depends on.
+STAT_FIELDS = ('created_at', 'end_date', 'desired_end_date', 'is_ended', 'deleted_at')
+COUNTERS = ('created', 'completed', 'completed_late', 'lead_time_seconds', 'due', 'due_open')
+
+
+def todo_row(todo):
+    return {field: getattr(todo, field) for field in STAT_FIELDS}
+
+
+def contributions(row):
+    """
+    Return ``{(date, counter): amount}`` for one todo's ``STAT_FIELDS`` row.
+
+    Deleted todos count for nothing. A todo ended without an ``end_date``
+    (created already ended) is completed on its creation day.
+    """
+    cells = Counter()
+    if row is None or row['deleted_at'] is not None or row['created_at'] is None:
+        return cells
+    created = row['created_at']
+    cells[timezone.localdate(created), 'created'] += 1
+    if row['is_ended']:
+        ended = row['end_date'] or created
+        day = timezone.localdate(ended)
+        cells[day, 'completed'] += 1
+        cells[day, 'lead_time_seconds'] += max(0, int((ended - created).total_seconds()))
+        if row['desired_end_date'] is not None and ended > row['desired_end_date']:
+            cells[day, 'completed_late'] += 1
+    if row['desired_end_date'] is not None:
+        day = timezone.localdate(row['desired_end_date'])
+        cells[day, 'due'] += 1
+        if not row['is_ended']:
+            cells[day, 'due_open'] += 1
+    return cells
+
+
+def apply(owner_id, old_rows, new_rows):
+    """
+    Move the owner's rollups from ``old_rows`` to ``new_rows``.
+
+    Only the cells that changed are written: one ``UPDATE`` per touched day,
+    or an ``INSERT`` for a day without a row yet.
+    """
+    delta = Counter()
+    for row in new_rows:
+        delta.update(contributions(row))
+    for row in old_rows:
+        delta.subtract(contributions(row))
+    days = defaultdict(dict)
+    for (day, counter), amount in delta.items():
+        if amount:
+            days[day][counter] = amount
+    for day, changes in sorted(days.items()):
+        _add(owner_id, day, changes)
+
+
+def _add(owner_id, day, changes):
+    rows = DailyStats.objects.filter(owner_id=owner_id, date=day)
+    if rows.update(**{counter: F(counter) + amount for counter, amount in changes.items()}):
+        return
+    try:
+        with transaction.atomic():
+            DailyStats.objects.create(owner_id=owner_id, date=day, **changes)
+    except IntegrityError:
+        # Another writer created the day first.
+        rows.update(**{counter: F(counter) + amount for counter, amount in changes.items()})
+
+
+def rebuild(owner_id, chunk_size=2000):
+    """
+    Recompute the owner's rollups from the todo table.
+    """
+    totals = Counter()
+    rows = Todo.all_objects.filter(owner_id=owner_id, deleted_at__isnull=True).values(*STAT_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        totals.update(contributions(row))
+    days = defaultdict(dict)
+    for (day, counter), amount in totals.items():
+        days[day][counter] = amount
+    with transaction.atomic():
+        DailyStats.objects.filter(owner_id=owner_id).delete()
+        DailyStats.objects.bulk_create([
+            DailyStats(owner_id=owner_id, date=day, **counters)
+            for day, counters in sorted(days.items())
+        ], batch_size=500)
+    return len(days)
+
+
+def summarize(owner_id, start, end, today=None):
+    """
+    Per-day rows and totals for ``start``..``end`` (inclusive), from the
+    rollup table alone. Days without activity are filled with zeros.
+    """
+    today = today or timezone.localdate()
+    stored = {
+        row.date: row
+        for row in DailyStats.objects.filter(owner_id=owner_id, date__range=(start, end))
+    }
+    days = []
+    totals = Counter()
+    day = start
+    while day <= end:
+        row = stored.get(day)
+        counters = {counter: getattr(row, counter) if row else 0 for counter in COUNTERS}
+        totals.update(counters)
+        if day < today:
+            totals['overdue'] += counters['due_open']
+        days.append({'date': day, **_with_average(counters)})
+        day += datetime.timedelta(days=1)
+    totals.setdefault('overdue', 0)
+    return {'from': start, 'to': end, 'totals': _with_average(dict(totals)), 'days': days}
+
+
+def _with_average(counters):
+    completed = counters['completed']
+    counters['average_lead_time_seconds'] = (
+        round(counters['lead_time_seconds'] / completed) if completed else None
+    )
+    return counters
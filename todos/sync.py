@@ -0,0 +1,140 @@
+"""
+Delta sync feed: what changed for an owner since a cursor.
+
+Every write stamps ``updated_at`` (soft deletes and tag changes included),
+so one ``(owner, updated_at, id)`` range scan per model finds both changed
+rows and tombstones. The cursor carries the last ``(updated_at, id)`` seen
+for each model plus the time it was issued.
+
+``updated_at`` is stamped before the writing transaction commits, so a
+slow writer can commit a row older than one already handed out. The cursor
+therefore stays ``TODOS_SYNC_LAG_SECONDS`` behind now, and rows changed
+within that lag are sent again on the next call; clients apply them as
+upserts.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .fast import render_todos, todo_values
+from .instrumentation import measure
+from .models import Todo, Tag
+from .serializers import TagSerializer
+
+MODELS = (('todos', Todo), ('tags', Tag))
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Sync cursor is older than the kept tombstones; sync from scratch.'
+    default_code = 'cursor_expired'
+
+
+def get_page_size():
+    return getattr(settings, 'TODOS_SYNC_PAGE_SIZE', 500)
+
+
+def get_tombstone_age():
+    # purge_todos defaults to --days 30; keep the two in step.
+    return datetime.timedelta(days=getattr(settings, 'TODOS_SYNC_TOMBSTONE_DAYS', 30))
+
+
+def get_lag():
+    return datetime.timedelta(seconds=getattr(settings, 'TODOS_SYNC_LAG_SECONDS', 5))
+
+
+def encode_cursor(positions, issued_at):
+    data = {'at': issued_at.isoformat()}
+    for name, position in positions.items():
+        data[name] = position and [position[0].isoformat(), position[1]]
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Return ``({model: (updated_at, id) or None}, issued_at)``.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        issued_at = parse_datetime(data['at'])
+        positions = {}
+        for name, _ in MODELS:
+            position = data.get(name)
+            if position is not None:
+                updated_at, pk = position
+                position = (parse_datetime(updated_at), int(pk))
+                if position[0] is None:
+                    raise ValueError
+            positions[name] = position
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+        raise ValidationError({'since': 'Invalid cursor.'})
+    if issued_at is None:
+        raise ValidationError({'since': 'Invalid cursor.'})
+    return positions, issued_at
+
+
+def changed_rows(model, owner_id, position, limit):
+    """
+    Return up to ``limit`` + 1 ``(id, updated_at, deleted_at)`` rows after ``position``.
+    """
+    queryset = model.all_objects.filter(owner_id=owner_id)
+    if position is not None:
+        updated_at, pk = position
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+    return list(
+        queryset.order_by('updated_at', 'id').values_list('id', 'updated_at', 'deleted_at')[:limit + 1]
+    )
+
+
+def render(name, ids, request):
+    if name == 'todos':
+        return render_todos(list(todo_values(Todo.objects.filter(id__in=ids).order_by('updated_at', 'id'))))
+    tags = Tag.objects.filter(id__in=ids).select_related('owner').prefetch_related('todos').order_by('updated_at', 'id')
+    with measure('serialize'):
+        return TagSerializer(tags, many=True, context={'request': request}).data
+
+
+def feed(request, owner_id, cursor=None):
+    """
+    Build one page of the feed for ``owner_id``.
+
+    Without a cursor every live row is returned (and no tombstones). Callers
+    repeat with the returned cursor while ``has_more`` is true.
+    """
+    now = timezone.now()
+    if cursor:
+        positions, issued_at = decode_cursor(cursor)
+        if issued_at < now - get_tombstone_age():
+            raise CursorExpired()
+    else:
+        positions = {name: None for name, _ in MODELS}
+    limit = get_page_size()
+    safe = now - get_lag()
+    data = {'deleted': {}, 'has_more': False}
+    for name, model in MODELS:
+        rows = changed_rows(model, owner_id, positions[name], limit)
+        truncated = len(rows) > limit
+        if truncated:
+            rows = rows[:limit]
+            data['has_more'] = True
+        live = [pk for pk, _, deleted_at in rows if deleted_at is None]
+        data[name] = render(name, live, request) if live else []
+        # A first sync has nothing to forget.
+        data['deleted'][name] = [pk for pk, _, deleted_at in rows if deleted_at is not None] if cursor else []
+        if truncated:
+            # Always move past a full page, or a burst would never drain.
+            settled = rows
+        else:
+            settled = [row for row in rows if row[1] <= safe]
+        if settled:
+            positions[name] = (settled[-1][1], settled[-1][0])
+    data['cursor'] = encode_cursor(positions, now)
+    return data
@@ -0,0 +1,161 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TransactionTestCase, override_settings
+from django.urls import include, path
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from testing.asgi import application
+from todos import async_views, cache
+from todos.models import Todo, Tag
+
+# async/는 TODOS_ASYNC_VIEWS일 때만 붙으므로 테스트용 urlconf에 직접 붙인다
+urlpatterns = [
+    path('async/', include(async_views.urlpatterns)),
+    path('', include('testing.urls')),
+]
+
+
+class SwappedUrls:
+    # TODOS_ASYNC_ROUTES = ['todos-list']와 같은 배치
+    urlpatterns = [
+        path(*async_views.ROUTES['todos-list']),
+        path('', include('testing.urls')),
+    ]
+
+
+async def asgi_request(path, token=None, method='GET', body=b'', app=application):
+    # testing.asgi.application에 직접 HTTP 요청을 보낸다
+    headers = [
+        (b'host', b'testserver'),
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+    ]
+    if token:
+        headers.append((b'authorization', b'Token ' + token.encode()))
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'headers': headers,
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    communicator = ApplicationCommunicator(app, scope)
+    await communicator.send_input({'type': 'http.request', 'body': body, 'more_body': False})
+    start = await communicator.receive_output(10)
+    content = b''
+    while True:
+        message = await communicator.receive_output(10)
+        content += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    await communicator.wait()
+    return start['status'], content
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncReadPathTest(TransactionTestCase):
+    # ASGIHandler은 요청마다 별도 thread에서 sync 코드를 실행하므로
+    # 데이터가 commit되어 있어야 한다
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.token = Token.objects.create(user=self.user).key
+        self.tag = Tag.objects.create(owner=self.user, name='tag')
+        for i in range(20):
+            todo = Todo.objects.create(owner=self.user, title='todo %d' % i)
+            todo.tag_list.add(self.tag)
+        self.todo = todo
+
+    async def get_json(self, path):
+        code, content = await asgi_request(path, self.token)
+        self.assertEqual(code, status.HTTP_200_OK)
+        return json.loads(content.replace(b'/async/', b'/'))
+
+    async def test_same_payload_as_sync_views(self):
+        for path in [
+            '/todos/?page_size=5',
+            '/todos/?fields=id,title,tag_list',
+            '/todos/%d/' % self.todo.id,
+            '/tags/',
+            '/tags/%d/todoList/?page_size=5' % self.tag.id,
+        ]:
+            self.assertEqual(await self.get_json('/async' + path), await self.get_json(path))
+
+    async def test_requires_authentication(self):
+        code, _ = await asgi_request('/async/todos/')
+        self.assertEqual(code, status.HTTP_401_UNAUTHORIZED)
+        code, _ = await asgi_request('/async/todos/999999/', self.token)
+        self.assertEqual(code, status.HTTP_404_NOT_FOUND)
+
+    async def test_writes_fall_back_to_sync_view(self):
+        body = json.dumps({'title': 'via async route', 'tag_list': []}).encode()
+        code, content = await asgi_request('/async/todos/', self.token, method='POST', body=body)
+        self.assertEqual(code, status.HTTP_201_CREATED, content)
+        self.assertEqual(json.loads(content)['title'], 'via async route')
+
+    async def test_shares_the_list_cache(self):
+        # sync view가 채운 page를 같은 URL의 async view가 그대로 쓴다
+        expected = await self.get_json('/todos/?page_size=5')
+        before = cache.stats()['hits']
+        authenticate = mock.patch.object(async_views, 'authenticate', wraps=async_views.authenticate)
+        with override_settings(ROOT_URLCONF=SwappedUrls), authenticate as served_async:
+            self.assertEqual(await self.get_json('/todos/?page_size=5'), expected)
+        self.assertTrue(served_async.called)
+        self.assertEqual(cache.stats()['hits'], before + 1)
+
+    @override_settings(TODOS_LIST_CACHE_TIMEOUT=0)
+    async def test_requests_overlap_on_one_loop(self):
+        # 모든 요청이 첫 query 안에 동시에 들어와야 barrier가 풀린다.
+        # 요청이 하나씩 처리되면 timeout으로 실패한다
+        count = 5
+        arrived = 0
+        everyone_in = asyncio.Event()
+        fetch = async_views.fetch
+
+        async def gated_fetch(queryset):
+            nonlocal arrived
+            arrived += 1
+            if arrived == count:
+                everyone_in.set()
+            await asyncio.wait_for(everyone_in.wait(), 5)
+            return await fetch(queryset)
+
+        with mock.patch.object(async_views, 'fetch', gated_fetch):
+            results = await asyncio.gather(*[
+                asgi_request('/async/todos/', self.token) for _ in range(count)
+            ])
+        self.assertEqual({code for code, _ in results}, {status.HTTP_200_OK})
+        self.assertGreaterEqual(arrived, count)
+
+    @override_settings(TODOS_THROTTLE_RATES={'todos.read': '2/min'}, TODOS_THROTTLE_CACHE='default')
+    async def test_throttled_like_the_sync_views(self):
+        caches['default'].clear()
+        for _ in range(2):
+            code, _ = await asgi_request('/async/todos/', self.token)
+            self.assertEqual(code, status.HTTP_200_OK)
+        with mock.patch.object(async_views, 'page_data') as page_data:
+            code, _ = await asgi_request('/async/todos/', self.token)
+        self.assertEqual(code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(page_data.called)
+
+    async def test_not_mounted_by_default(self):
+        with override_settings(ROOT_URLCONF='testing.urls'):
+            code, _ = await asgi_request('/async/todos/', self.token)
+        self.assertEqual(code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from todos import benchmark
+
+
+class BenchmarkTest(TestCase):
+    def test_every_scenario_runs(self):
+        # 작은 데이터로 모든 endpoint가 에러 없이 도는지만 확인
+        result = benchmark.run(users=2, todos=30, tags=5, requests=3, warmup=1)
+        self.assertEqual(set(result['endpoints']), {name for name, _, _ in benchmark.SCENARIOS})
+        for name, stats in result['endpoints'].items():
+            self.assertEqual(stats['errors'], 0, name)
+            self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+            self.assertLessEqual(stats['p95_ms'], stats['p99_ms'])
+
+    def test_seed_is_deterministic(self):
+        first = benchmark.seed(users=1, todos=20, tags=5, random_seed=7)[0]
+        titles = list(benchmark.Todo.objects.filter(id__in=first['todos']).values_list('title', flat=True))
+        benchmark.Todo.objects.all().delete()
+        benchmark.Tag.objects.all().delete()
+        benchmark.User.objects.all().delete()
+        second = benchmark.seed(users=1, todos=20, tags=5, random_seed=7)[0]
+        self.assertEqual(
+            list(benchmark.Todo.objects.filter(id__in=second['todos']).values_list('title', flat=True)),
+            titles,
+        )
+
+    def test_compare(self):
+        baseline = {'endpoints': {'todos-list': {'p95_ms': 10.0}, 'tags-list': {'p95_ms': 10.0}}}
+        result = {'endpoints': {'todos-list': {'p95_ms': 15.0}, 'tags-list': {'p95_ms': 11.0}, 'sync': {'p95_ms': 1.0}}}
+        self.assertEqual(benchmark.compare(result, baseline, 1.25), {'todos-list': 1.5})
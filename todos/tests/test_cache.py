@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos import cache
+from todos.models import Todo, Tag
+
+TODO_BASE_URL = reverse('todos-list')
+TAG_BASE_URL = reverse('tags-list')
+
+
+class ListCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo = Todo.objects.create(owner=self.user, title='cached')
+        self.tag = Tag.objects.create(owner=self.user, name='tag')
+
+    def titles(self):
+        return [todo['title'] for todo in self.client.get(TODO_BASE_URL).data['results']]
+
+    def test_repeated_poll_hits_cache(self):
+        # 같은 요청을 반복하면 DB query 없이 cache에서 응답
+        first = self.client.get(TODO_BASE_URL)
+        before = cache.stats()
+        with self.assertNumQueries(0):
+            second = self.client.get(TODO_BASE_URL)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(cache.stats()['hits'], before['hits'] + 1)
+
+    def test_tag_list_cached(self):
+        self.client.get(TAG_BASE_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(TAG_BASE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_save_invalidates(self):
+        self.titles()
+        self.client.post(TODO_BASE_URL, {'title': 'new'})
+        self.assertEqual(self.titles(), ['cached', 'new'])
+
+    def test_soft_delete_and_restore_invalidate(self):
+        self.titles()
+        self.todo.delete()
+        self.assertEqual(self.titles(), [])
+        self.todo.restore()
+        self.assertEqual(self.titles(), ['cached'])
+
+    def test_tag_change_invalidates(self):
+        self.client.get(TODO_BASE_URL)
+        self.todo.tag_list.add(self.tag)
+        res = self.client.get(TODO_BASE_URL)
+        self.assertEqual(res.data['results'][0]['tag_list'], ['tag'])
+
+    def test_bulk_delete_invalidates(self):
+        self.titles()
+        self.client.post(TODO_BASE_URL + 'bulk/', {'delete': [self.todo.id]}, format='json')
+        self.assertEqual(self.titles(), [])
+
+    def test_other_users_lists_untouched(self):
+        other = get_user_model().objects.create_user(username='other', password='ckalscjf11')
+        self.client.get(TODO_BASE_URL)
+        Todo.objects.create(owner=other, title='theirs')
+        with self.assertNumQueries(0):
+            self.client.get(TODO_BASE_URL)
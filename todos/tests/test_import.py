@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos.models import Todo, Tag
+
+TODO_BASE_URL = reverse('todos-list')
+IMPORT_URL = TODO_BASE_URL + 'import/'
+
+
+class ImportTodosTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_import_ndjson(self):
+        # 잘못된 줄은 건너뛰고 오류로 보고, tag는 한번만 생성
+        Tag.objects.create(owner=self.user, name='existing')
+        lines = [
+            {'title': 'first', 'tag_list': ['existing', 'new']},
+            {'title': 'second', 'tag_list': ['new']},
+            {'description': 'no title'},
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+        upload = SimpleUploadedFile('todos.ndjson', body.encode())
+        with self.settings(TODOS_IMPORT_BATCH_SIZE=2):
+            res = self.client.post(IMPORT_URL, {'file': upload})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['imported'], 2)
+        self.assertEqual([error['line'] for error in res.data['errors']], [3, 4])
+        self.assertEqual(Tag.objects.filter(owner=self.user, name='new').count(), 1)
+        first = Todo.objects.get(owner=self.user, title='first')
+        self.assertEqual(sorted(tag.name for tag in first.tag_list.all()), ['existing', 'new'])
+
+    def test_repeated_tag_names(self):
+        body = b'{"title": "a", "tag_list": ["x", "x"]}\n'
+        res = self.client.post(IMPORT_URL, {'file': SimpleUploadedFile('todos.ndjson', body)})
+        self.assertEqual(res.data['imported'], 1)
+        body = b'title,tag_list\nb,x|x\n'
+        res = self.client.post(IMPORT_URL, {'file': SimpleUploadedFile('todos.csv', body)})
+        self.assertEqual(res.data['imported'], 1)
+        for todo in Todo.objects.filter(owner=self.user):
+            self.assertEqual([tag.name for tag in todo.tag_list.all()], ['x'])
+
+    def test_undecodable_lines_are_row_errors(self):
+        body = b'\xff\xfe{}\n{"title": "ok"}\n'
+        res = self.client.post(IMPORT_URL, {'file': SimpleUploadedFile('todos.ndjson', body)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['imported'], 1)
+        self.assertEqual([error['line'] for error in res.data['errors']], [1])
+
+        huge = b'x' * (csv.field_size_limit() + 1)
+        body = b'title,description\nbad \xff,x\nhuge,' + huge + b'\ngood,y\n'
+        res = self.client.post(IMPORT_URL, {'file': SimpleUploadedFile('todos.csv', body)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['imported'], 1)
+        self.assertEqual([error['line'] for error in res.data['errors']], [2, 3])
+        self.assertTrue(Todo.objects.filter(owner=self.user, title='good').exists())
+
+    def test_export_import_csv_roundtrip(self):
+        todo = Todo.objects.create(owner=self.user, title='exported', description='text')
+        todo.tag_list.add(Tag.objects.create(owner=self.user, name='a'))
+        res = self.client.get(TODO_BASE_URL + 'export/', {'type': 'csv'})
+        body = b''.join(res.streaming_content)
+
+        other = get_user_model().objects.create_user(username='other', password='ckalscjf11')
+        self.client.force_authenticate(user=other)
+        res = self.client.post(IMPORT_URL, {'file': SimpleUploadedFile('todos.csv', body)})
+        self.assertEqual(res.data['imported'], 1)
+        copy = Todo.objects.get(owner=other)
+        self.assertEqual((copy.title, copy.description), ('exported', 'text'))
+        self.assertEqual([tag.owner for tag in copy.tag_list.all()], [other])
+
+    def test_unknown_type(self):
+        upload = SimpleUploadedFile('todos.xml', b'<todos/>')
+        res = self.client.post(IMPORT_URL, {'file': upload})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson') as f:
+            f.write(json.dumps({'title': 'from command', 'tag_list': ['cli']}) + '\n')
+            f.flush()
+            call_command('import_todos', 'testme', f.name, stdout=io.StringIO())
+        self.assertTrue(Todo.objects.filter(owner=self.user, title='from command', tag_list__name='cli').exists())
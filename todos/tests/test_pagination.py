@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos.models import Todo, Tag
+
+TODO_BASE_URL = reverse('todos-list')
+TAG_BASE_URL = reverse('tags-list')
+USER_BASE_URL = reverse('users-list')
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todos = [Todo.objects.create(owner=self.user, title=str(i)) for i in range(7)]
+        # created_at이 같은 row들도 id로 순서가 정해져야 한다
+        same = timezone.now()
+        Todo.objects.filter(id__in=[t.id for t in self.todos[2:5]]).update(created_at=same)
+        self.expected = list(Todo.objects.order_by('created_at', 'id').values_list('id', flat=True))
+
+    def walk(self, url):
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [item['id'] for item in res.data['results']]
+            url = res.data['next']
+        return ids, res
+
+    def test_walk_all_pages_in_order(self):
+        ids, _ = self.walk(TODO_BASE_URL + '?page_size=2')
+        self.assertEqual(ids, self.expected)
+
+    def test_walk_back_with_previous(self):
+        _, last = self.walk(TODO_BASE_URL + '?page_size=2')
+        ids = [item['id'] for item in last.data['results']]
+        url = last.data['previous']
+        while url:
+            res = self.client.get(url)
+            ids = [item['id'] for item in res.data['results']] + ids
+            url = res.data['previous']
+        self.assertEqual(ids, self.expected)
+
+    def test_page_size_capped(self):
+        res = self.client.get(TODO_BASE_URL + '?page_size=100000')
+        self.assertEqual(len(res.data['results']), 7)
+        self.assertIsNone(res.data['next'])
+
+    def test_deep_page_costs_same_as_first(self):
+        with CaptureQueriesContext(connection) as first:
+            res = self.client.get(TODO_BASE_URL + '?page_size=2')
+        with CaptureQueriesContext(connection) as later:
+            self.client.get(res.data['next'])
+        self.assertEqual(len(first), len(later))
+        self.assertNotIn('OFFSET', later.captured_queries[0]['sql'])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(TODO_BASE_URL + '?cursor=cD1ub3RhZGF0ZXwx')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tags_and_users_paginated(self):
+        for i in range(3):
+            Tag.objects.create(owner=self.user, name=str(i))
+        ids, _ = self.walk(TAG_BASE_URL + '?page_size=2')
+        self.assertEqual(len(ids), 3)
+        ids, _ = self.walk(USER_BASE_URL + '?page_size=2')
+        self.assertEqual(ids, [self.user.id])
@@ -0,0 +1,58 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from todos.models import ArchivedTodo, Todo, Tag
+
+
+class PurgeTodosTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.tag = Tag.objects.create(owner=self.user, name='tag')
+        self.old = []
+        for i in range(5):
+            todo = Todo.objects.create(owner=self.user, title='old %d' % i)
+            todo.tag_list.add(self.tag)
+            self.old.append(todo)
+        Todo.objects.filter(id__in=[todo.id for todo in self.old]).update(
+            deleted_at=timezone.now() - timezone.timedelta(days=40)
+        )
+        self.recent = Todo.objects.create(owner=self.user, title='recent')
+        self.recent.delete()
+        self.live = Todo.objects.create(owner=self.user, title='live')
+
+    def purge(self, *args):
+        call_command('purge_todos', '--days=30', '--batch-size=2', '--pause=0', *args, stdout=io.StringIO())
+
+    def test_archive_old_tombstones(self):
+        # 오래된 삭제 todo는 archive로 옮기고, 최근 삭제/살아있는 todo는 유지
+        self.purge()
+        self.assertEqual(
+            sorted(Todo.all_objects.values_list('title', flat=True)),
+            ['live', 'recent'],
+        )
+        archived = ArchivedTodo.objects.order_by('todo_id')
+        self.assertEqual([row.todo_id for row in archived], [todo.id for todo in self.old])
+        self.assertEqual(archived[0].tag_names, ['tag'])
+        self.assertEqual(list(self.tag.todos.all()), [])
+
+    def test_hard_delete(self):
+        self.purge('--hard')
+        self.assertEqual(Todo.all_objects.count(), 2)
+        self.assertFalse(ArchivedTodo.objects.exists())
+
+    def test_list_uses_live_partial_index(self):
+        queryset = Todo.objects.filter(owner=self.user).order_by('created_at', 'id')
+        with connection.cursor() as cursor:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('todo_live_owner_created_idx', plan)
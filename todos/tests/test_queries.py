@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos.models import Todo, Tag
+
+TODO_BASE_URL = reverse('todos-list')
+TAG_BASE_URL = reverse('tags-list')
+
+
+class QueryBudgetTest(TestCase):
+    # row 수가 늘어나도 endpoint 당 query 수는 그대로여야 한다 (N+1 방지)
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(owner=self.user, name='shared')
+
+    def add_rows(self, count):
+        for i in range(count):
+            todo = Todo.objects.create(
+                owner=self.user,
+                title='todo %d' % i,
+                desired_end_date=timezone.now() + timezone.timedelta(days=1),
+            )
+            tag = Tag.objects.create(owner=self.user, name='tag %d' % i)
+            todo.tag_list.set([self.tag, tag])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(ctx)
+
+    def assertConstantQueries(self, url):
+        self.add_rows(2)
+        small = self.count_queries(url)
+        self.add_rows(10)
+        large = self.count_queries(url)
+        self.assertEqual(small, large)
+
+    def test_todo_list(self):
+        self.assertConstantQueries(TODO_BASE_URL)
+
+    def test_todo_within3days(self):
+        self.assertConstantQueries(TODO_BASE_URL + 'within3days/')
+
+    def test_tag_list(self):
+        self.assertConstantQueries(TAG_BASE_URL)
+
+    def test_todo_list_by_tag(self):
+        self.assertConstantQueries(TAG_BASE_URL + str(self.tag.id) + '/todoList/')
+
+    def test_todo_detail(self):
+        todo = Todo.objects.create(owner=self.user, title='detail')
+        todo.tag_list.set([self.tag])
+        url = TODO_BASE_URL + str(todo.id) + '/'
+        small = self.count_queries(url)
+        todo.tag_list.add(*[Tag.objects.create(owner=self.user, name=str(i)) for i in range(10)])
+        self.assertEqual(small, self.count_queries(url))
+
+    def test_tag_detail(self):
+        url = TAG_BASE_URL + str(self.tag.id) + '/'
+        small = self.count_queries(url)
+        self.add_rows(10)
+        self.assertEqual(small, self.count_queries(url))
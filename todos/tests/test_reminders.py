@@ -0,0 +1,182 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from todos.models import ReminderOutbox, Todo
+from todos.reminders import OutboxSink, ReminderScheduler, WebhookSink
+
+MINUTE = datetime.timedelta(minutes=1)
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def deliver(self, reminders):
+        self.batches.append([reminder['title'] for reminder in reminders])
+
+    @property
+    def titles(self):
+        return [title for batch in self.batches for title in batch]
+
+
+class FlakySink(ListSink):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def deliver(self, reminders):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('sink is down')
+        super().deliver(reminders)
+
+
+class ReminderSchedulerTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.now = timezone.now()
+        self.sink = ListSink()
+        self.scheduler = ReminderScheduler(self.sink, lead=10 * MINUTE, window=60 * MINUTE, batch_size=2)
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def todo(self, title, minutes, **kwargs):
+        return Todo.objects.create(
+            owner=self.user, title=title, desired_end_date=self.now + minutes * MINUTE, **kwargs
+        )
+
+    def test_loads_only_the_window(self):
+        self.todo('soon', 30)
+        self.todo('later', 300)
+        self.todo('ended', 30, is_ended=True)
+        self.todo('past', -5)
+        self.todo('deleted', 30).delete()
+        self.scheduler.start(self.now)
+        self.assertEqual(len(self.scheduler.scheduled), 1)
+        self.scheduler.run_pending(self.now + 21 * MINUTE)
+        self.assertEqual(self.sink.titles, ['soon'])
+        # window가 앞으로 밀리면서 나머지도 읽어 온다
+        self.scheduler.run_pending(self.now + 291 * MINUTE)
+        self.assertEqual(self.sink.titles, ['soon', 'later'])
+
+    def test_delivers_in_batches_in_deadline_order(self):
+        for minutes in (15, 13, 11, 12, 14):
+            self.todo('due %d' % minutes, minutes)
+        self.scheduler.start(self.now)
+        self.assertEqual(self.scheduler.run_pending(self.now + 5 * MINUTE), 5)
+        self.assertEqual(self.sink.batches, [['due 11', 'due 12'], ['due 13', 'due 14'], ['due 15']])
+        self.assertEqual(self.scheduler.run_pending(self.now + 6 * MINUTE), 0)
+
+    def test_wakes_for_the_next_reminder(self):
+        self.todo('a', 40)
+        self.scheduler.start(self.now)
+        self.assertEqual(self.scheduler.next_wakeup(), self.now + 30 * MINUTE)
+
+    def test_signals_reschedule_and_cancel(self):
+        moved = self.todo('moved', 20)
+        deleted = self.todo('deleted', 20)
+        ended = self.todo('ended', 20)
+        self.scheduler.start(self.now)
+        moved.desired_end_date = self.now + 40 * MINUTE
+        moved.save()
+        deleted.delete()
+        ended.is_ended = True
+        ended.save()
+        self.scheduler.run_pending(self.now + 15 * MINUTE)
+        self.assertEqual(self.sink.titles, [])
+        self.scheduler.run_pending(self.now + 35 * MINUTE)
+        self.assertEqual(self.sink.titles, ['moved'])
+
+    def test_polls_edits_from_other_processes(self):
+        todo = self.todo('a', 20)
+        self.scheduler.start(self.now)
+        # update()는 signal을 보내지 않는다 (다른 worker의 수정과 같음)
+        Todo.objects.filter(pk=todo.pk).update(
+            desired_end_date=self.now + 50 * MINUTE, updated_at=timezone.now()
+        )
+        self.scheduler.run_pending(self.now + 15 * MINUTE)
+        self.assertEqual(self.sink.titles, [])
+        self.scheduler.run_pending(self.now + 45 * MINUTE)
+        self.assertEqual(self.sink.titles, ['a'])
+
+    def test_edits_after_delivery_do_not_repeat(self):
+        todo = self.todo('a', 20)
+        self.scheduler.start(self.now)
+        self.scheduler.run_pending(self.now + 15 * MINUTE)
+        todo.title = 'b'
+        todo.save()
+        self.scheduler.run_pending(self.now + 16 * MINUTE)
+        self.assertEqual(self.sink.titles, ['a'])
+
+    def test_failed_batches_are_retried_with_backoff(self):
+        self.todo('a', 20)
+        self.todo('b', 21)
+        sink = FlakySink(failures=2)
+        scheduler = ReminderScheduler(sink, lead=10 * MINUTE, window=60 * MINUTE, retry=MINUTE)
+        scheduler.start(self.now)
+        self.addCleanup(scheduler.stop)
+        with self.assertLogs('todos.reminders', 'ERROR'):
+            self.assertEqual(scheduler.run_pending(self.now + 15 * MINUTE), 0)
+        self.assertEqual(scheduler.next_wakeup(), self.now + 16 * MINUTE)
+        with self.assertLogs('todos.reminders', 'ERROR'):
+            self.assertEqual(scheduler.run_pending(self.now + 16 * MINUTE), 0)
+        # 두 번째 실패 뒤에는 2분을 기다린다
+        self.assertEqual(scheduler.run_pending(self.now + 17 * MINUTE), 0)
+        self.assertEqual(scheduler.run_pending(self.now + 18 * MINUTE), 2)
+        self.assertEqual(sink.titles, ['a', 'b'])
+        self.assertEqual(scheduler.run_pending(self.now + 19 * MINUTE), 0)
+
+    def test_idle_run_is_constant_queries(self):
+        for minutes in range(100):
+            self.todo('t', 120 + minutes)
+        self.scheduler.start(self.now)
+        # window 밖의 row는 보지 않는다: 변경 poll 하나와 window 확장 하나
+        with self.assertNumQueries(2):
+            self.scheduler.run_pending(self.now + MINUTE)
+
+
+class WebhookSinkTest(TestCase):
+    def test_url_is_required(self):
+        for url in (None, '', 'example.com/hook', 'ftp://example.com/hook'):
+            with self.subTest(url=url), override_settings(TODOS_REMINDER_WEBHOOK_URL=url):
+                with self.assertRaises(ImproperlyConfigured):
+                    WebhookSink()
+        self.assertEqual(WebhookSink('https://example.com/hook').url, 'https://example.com/hook')
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.todo = Todo.objects.create(
+            owner=self.user, title='a', desired_end_date=timezone.now() + 5 * MINUTE
+        )
+
+    def test_outbox_is_idempotent(self):
+        reminder = {'todo_id': self.todo.id, 'owner_id': self.user.id, 'title': 'a',
+                    'due_at': self.todo.desired_end_date}
+        OutboxSink().deliver([reminder])
+        OutboxSink().deliver([reminder])
+        self.assertEqual(ReminderOutbox.objects.count(), 1)
+
+    @override_settings(TODOS_REMINDER_SINK='todos.reminders.OutboxSink')
+    def test_worker_once(self):
+        out = io.StringIO()
+        call_command('run_reminders', once=True, stdout=out)
+        self.assertIn('delivered 1 reminders', out.getvalue())
+        outbox = ReminderOutbox.objects.get()
+        self.assertEqual((outbox.todo, outbox.title, outbox.sent_at), (self.todo, 'a', None))
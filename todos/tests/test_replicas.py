@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos import cache, replicas
+from todos.models import Todo
+
+TODO_BASE_URL = reverse('todos-list')
+
+
+@override_settings(TODOS_LIST_CACHE_TIMEOUT=0)
+class ReadReplicaTest(TransactionTestCase):
+    # primary(테스트 DB)와 replica(임시 sqlite 파일)를 따로 두고 어디서 읽는지 확인
+    # replica alias는 test runner가 모르는 DB라 class setup 뒤에 등록한다
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        settings = connections.configure_settings({
+            'default': {},
+            'replica': {'ENGINE': 'todos.db.sqlite3', 'NAME': os.path.join(cls.directory.name, 'replica.sqlite3')},
+        })
+        connections.settings['replica'] = settings['replica']
+        call_command('migrate', database='replica', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.user.save(using='replica')
+        self.client.force_authenticate(user=self.user)
+        Todo.objects.create(owner=self.user, title='on primary')
+        Todo(owner=self.user, title='on replica').save(using='replica')
+
+    def tearDown(self):
+        Todo.all_objects.using('replica').all().delete()
+        get_user_model().objects.using('replica').all().delete()
+
+    def titles(self, url=TODO_BASE_URL):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [todo['title'] for todo in res.data['results']]
+
+    def test_reads_primary_without_replicas(self):
+        self.assertEqual(self.titles(), ['on primary'])
+
+    def test_router_and_middleware(self):
+        with self.settings(TODOS_READ_REPLICAS=['replica']):
+            self.client = APIClient()  # middleware는 handler를 만들 때 설정을 읽는다
+            self.client.force_authenticate(user=self.user)
+            self.assertEqual(self.titles(), ['on replica'])
+
+            res = self.client.post(TODO_BASE_URL, {'title': 'written', 'tag_list': []}, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            self.assertTrue(Todo.objects.using('default').filter(title='written').exists())
+            self.assertFalse(Todo.objects.using('replica').filter(title='written').exists())
+
+            # request 밖(command, shell)에서는 항상 primary
+            self.assertEqual(Todo.objects.count(), 2)
+
+    @override_settings(TODOS_LIST_CACHE_TIMEOUT=60)
+    def test_cached_lists_are_rebuilt_from_primary_after_a_write(self):
+        caches['default'].clear()
+        with self.settings(TODOS_READ_REPLICAS=['replica']):
+            self.client = APIClient()
+            self.client.force_authenticate(user=self.user)
+            self.assertEqual(self.titles(), ['on replica'])
+
+            res = self.client.post(TODO_BASE_URL, {'title': 'written', 'tag_list': []}, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            # replica가 아직 따라오지 않았어도 새 version에는 primary의 page가 들어간다
+            self.assertEqual(sorted(self.titles()), ['on primary', 'written'])
+            self.assertEqual(sorted(self.titles()), ['on primary', 'written'])
+
+            # lag가 지나면 다시 replica에서 읽는다
+            caches['default'].delete(cache.WRITTEN_KEY % self.user.id)
+            self.assertEqual(self.titles(TODO_BASE_URL + '?page_size=5'), ['on replica'])
+
+    def test_pinned_after_write(self):
+        router = replicas.ReadReplicaRouter()
+        with self.settings(TODOS_READ_REPLICAS=['replica']):
+            token = replicas._state.set({'replica': True, 'pinned': False})
+            try:
+                self.assertEqual(router.db_for_read(Todo), 'replica')
+                router.db_for_write(Todo)
+                self.assertIsNone(router.db_for_read(Todo))
+            finally:
+                replicas._state.reset(token)
+
+            token = replicas._state.set({'replica': False, 'pinned': False})
+            try:
+                self.assertIsNone(router.db_for_read(Todo))
+            finally:
+                replicas._state.reset(token)
+            self.assertFalse(router.allow_migrate('replica', 'todos'))
@@ -0,0 +1,81 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos.models import Todo
+from todos.search import match_expression
+
+SEARCH_URL = reverse('todos-search')
+
+
+class TodoSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.in_title = Todo.objects.create(owner=self.user, title='weekly report', description='send it')
+        self.in_description = Todo.objects.create(owner=self.user, title='monday', description='draft the report')
+        Todo.objects.create(owner=self.user, title='groceries', description='milk')
+
+    def search(self, q, **params):
+        return self.client.get(SEARCH_URL, {'q': q, **params})
+
+    def titles(self, res):
+        return [todo['title'] for todo in res.data['results']]
+
+    def test_ranked_matches(self):
+        # 제목에 있는 단어가 설명에 있는 것보다 먼저
+        res = self.search('report')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(self.titles(res), ['weekly report', 'monday'])
+
+    def test_prefix_and_all_words(self):
+        self.assertEqual(self.titles(self.search('rep week')), ['weekly report'])
+
+    def test_scoped_to_owner_and_live_todos(self):
+        other = get_user_model().objects.create_user(
+            email='test2@test.com',
+            username='testme2',
+            password='ckalscjf11',
+        )
+        Todo.objects.create(owner=other, title='report of another user')
+        self.in_description.delete()
+        self.assertEqual(self.titles(self.search('report')), ['weekly report'])
+
+    def test_index_follows_updates(self):
+        Todo.objects.filter(pk=self.in_title.pk).update(title='weekly summary')
+        self.assertEqual(self.titles(self.search('report')), ['monday'])
+        self.assertEqual(self.titles(self.search('summary')), ['weekly summary'])
+        Todo.objects.filter(pk=self.in_description.pk).delete()
+        self.assertEqual(self.titles(self.search('report')), [])
+
+    def test_pagination(self):
+        res = self.search('report', page_size=1)
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(self.titles(res), ['weekly report'])
+        res = self.client.get(res.data['next'])
+        self.assertEqual(self.titles(res), ['monday'])
+
+    def test_operators_are_literal(self):
+        self.assertEqual(match_expression('report OR "x" NEAR(*'), '"report"* "OR"* "x"* "NEAR"*')
+        self.assertEqual(self.search('report AND').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.search('  ** ').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO todos_todo_fts(todos_todo_fts) VALUES ('delete-all')")
+        self.assertEqual(self.titles(self.search('report')), [])
+        call_command('rebuild_todo_search', stdout=io.StringIO())
+        self.assertEqual(self.titles(self.search('report')), ['weekly report', 'monday'])
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connections, transaction
+from django.test import SimpleTestCase
+
+
+@contextmanager
+def file_database(engine, **options):
+    # 임시 파일 DB를 connections에 잠깐 등록한다 (thread마다 connection이 따로 열림)
+    with tempfile.TemporaryDirectory() as directory:
+        alias = 'sqlite_%s' % os.path.basename(directory)
+        settings = connections.configure_settings({
+            'default': {},
+            alias: {'ENGINE': engine, 'NAME': os.path.join(directory, 'db.sqlite3'), 'OPTIONS': options},
+        })
+        connections.settings[alias] = settings[alias]
+        try:
+            yield alias
+        finally:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+
+def interleave(alias):
+    """
+    Run two read-then-write transactions, the second reading while the
+    first is still open, as far as the backend lets it.
+
+    Returns (whether they overlapped, lock errors, rows written).
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute('CREATE TABLE counter (id INTEGER PRIMARY KEY, n INTEGER)')
+    first_read = threading.Event()
+    second_read = threading.Event()
+    overlapped = []
+    errors = []
+
+    def transact(n, before_write):
+        try:
+            with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM counter')
+                cursor.fetchone()
+                before_write()
+                cursor.execute('INSERT INTO counter (n) VALUES (%s)', [n])
+        except OperationalError as exc:
+            errors.append(exc)
+        finally:
+            connections[alias].close()
+
+    def first():
+        # BEGIN IMMEDIATE가 두 번째 transaction을 막고 있으면 timeout 뒤 진행한다
+        def wait_for_second():
+            first_read.set()
+            overlapped.append(second_read.wait(1))
+        transact(1, wait_for_second)
+
+    def second():
+        first_read.wait()
+        transact(2, second_read.set)
+
+    workers = [threading.Thread(target=first), threading.Thread(target=second)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM counter')
+        written = cursor.fetchone()[0]
+    return overlapped == [True], errors, written
+
+
+class SQLiteBackendTest(SimpleTestCase):
+    def test_pragmas(self):
+        with file_database('todos.db.sqlite3', pragmas={'cache_size': -1000}) as alias:
+            with connections[alias].cursor() as cursor:
+                values = {}
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'foreign_keys'):
+                    cursor.execute('PRAGMA %s' % pragma)
+                    values[pragma] = cursor.fetchone()[0]
+        self.assertEqual(values, {
+            'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+            'cache_size': -1000, 'foreign_keys': 1,
+        })
+
+    def test_invalid_transaction_mode(self):
+        with file_database('todos.db.sqlite3', transaction_mode='sometimes') as alias:
+            with self.assertRaises(ImproperlyConfigured):
+                connections[alias].ensure_connection()
+
+    def test_concurrent_writers(self):
+        # 기본 backend: 두 transaction이 모두 read한 뒤 write하면 한쪽이 바로 locked 에러
+        with file_database('django.db.backends.sqlite3', timeout=0.2) as alias:
+            overlapped, errors, written = interleave(alias)
+        self.assertTrue(overlapped)
+        self.assertGreaterEqual(len(errors), 1)
+        self.assertTrue(all('database is locked' in str(exc) for exc in errors))
+        self.assertEqual(written, 2 - len(errors))
+
+    def test_concurrent_writers_wait_for_the_lock(self):
+        # BEGIN IMMEDIATE: 두 번째 transaction은 첫 번째가 commit할 때까지 기다린다
+        with file_database('todos.db.sqlite3') as alias:
+            overlapped, errors, written = interleave(alias)
+        self.assertFalse(overlapped)
+        self.assertEqual(errors, [])
+        self.assertEqual(written, 2)
@@ -0,0 +1,138 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos import bulk, importer, stats
+from todos.models import DailyStats, Todo
+
+STATS_URL = reverse('stats')
+
+
+def snapshot(owner):
+    return list(DailyStats.objects.filter(owner=owner).exclude(
+        created=0, completed=0, completed_late=0, lead_time_seconds=0, due=0, due_open=0,
+    ).values('date', *stats.COUNTERS))
+
+
+class DailyStatsTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.now = timezone.now()
+
+    def assertMatchesRebuild(self):
+        # 증분으로 유지한 값이 전체 재계산과 같아야 한다
+        incremental = snapshot(self.user)
+        stats.rebuild(self.user.id)
+        self.assertEqual(incremental, snapshot(self.user))
+
+    def test_create_counts_today(self):
+        Todo.objects.create(owner=self.user, title='a')
+        Todo.objects.create(owner=self.user, title='b', desired_end_date=self.now)
+        row = DailyStats.objects.get(owner=self.user, date=timezone.localdate())
+        self.assertEqual((row.created, row.due, row.due_open), (2, 1, 1))
+        self.assertMatchesRebuild()
+
+    def test_completing_moves_due_open_to_completed(self):
+        deadline = self.now - datetime.timedelta(days=1)
+        todo = Todo.objects.create(owner=self.user, title='a', desired_end_date=deadline)
+        todo.is_ended = True
+        todo.end_date = self.now
+        todo.save()
+        due = DailyStats.objects.get(owner=self.user, date=timezone.localdate(deadline))
+        self.assertEqual((due.due, due.due_open), (1, 0))
+        done = DailyStats.objects.get(owner=self.user, date=timezone.localdate())
+        self.assertEqual((done.completed, done.completed_late), (1, 1))
+        self.assertMatchesRebuild()
+
+    def test_soft_delete_and_restore(self):
+        todo = Todo.objects.create(owner=self.user, title='a', desired_end_date=self.now)
+        todo.delete()
+        self.assertEqual(snapshot(self.user), [])
+        todo.restore()
+        self.assertEqual(len(snapshot(self.user)), 1)
+        self.assertMatchesRebuild()
+        Todo.all_objects.filter(pk=todo.pk).delete()
+        self.assertEqual(snapshot(self.user), [])
+
+    def test_unrelated_update_fields_skip_rollups(self):
+        todo = Todo.objects.create(owner=self.user, title='a')
+        todo.title = 'b'
+        with self.assertNumQueries(1):
+            todo.save(update_fields=['title'])
+
+    def test_bulk_and_import_paths(self):
+        created = bulk.create_todos(self.user.id, [
+            {'title': 'a', 'tag_list': []},
+            {'title': 'b', 'desired_end_date': self.now, 'tag_list': []},
+        ])
+        bulk.update_todos(self.user.id, {created[0].id: {'is_ended': True}})
+        bulk.delete_todos(self.user.id, [created[1].id])
+        importer.write_batch(self.user.id, [{'title': 'c', 'desired_end_date': self.now, 'tag_list': []}])
+        row = DailyStats.objects.get(owner=self.user, date=timezone.localdate())
+        self.assertEqual((row.created, row.completed, row.due, row.due_open), (2, 1, 1, 1))
+        self.assertMatchesRebuild()
+
+    def test_backfill_command(self):
+        Todo.objects.create(owner=self.user, title='a')
+        DailyStats.objects.all().delete()
+        call_command('backfill_daily_stats', username='testme', stdout=io.StringIO())
+        self.assertEqual(DailyStats.objects.get(owner=self.user).created, 1)
+
+
+class StatsViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.localdate()
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        res = self.client.get(STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_default_range_is_last_30_days(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        Todo.objects.create(owner=self.user, title='a', desired_end_date=yesterday)
+        Todo.objects.create(owner=self.user, title='b', is_ended=True)
+        with self.assertNumQueries(1):
+            res = self.client.get(STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['days']), 30)
+        self.assertEqual(res.data['to'], self.today)
+        totals = res.data['totals']
+        self.assertEqual((totals['created'], totals['completed'], totals['overdue']), (2, 1, 1))
+        self.assertEqual(totals['average_lead_time_seconds'], 0)
+
+    def test_other_users_are_not_counted(self):
+        other = get_user_model().objects.create_user(username='other', password='ckalscjf11')
+        Todo.objects.create(owner=other, title='a')
+        res = self.client.get(STATS_URL)
+        self.assertEqual(res.data['totals']['created'], 0)
+        self.assertIsNone(res.data['totals']['average_lead_time_seconds'])
+
+    def test_invalid_ranges(self):
+        day = datetime.timedelta(days=1)
+        for params in (
+            {'from': self.today, 'to': self.today - day},
+            {'from': self.today - 366 * day, 'to': self.today},
+            {'from': 'yesterday'},
+        ):
+            res = self.client.get(STATS_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
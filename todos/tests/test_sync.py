@@ -0,0 +1,164 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos import sync
+from todos.models import Todo, Tag
+
+SYNC_URL = reverse('sync')
+
+
+# 대부분의 테스트는 방금 쓴 row가 cursor에 포함된다고 가정한다
+@override_settings(TODOS_SYNC_LAG_SECONDS=0)
+class SyncFeedTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(owner=self.user, name='tag')
+        self.todo = Todo.objects.create(owner=self.user, title='todo')
+        self.todo.tag_list.add(self.tag)
+
+    def sync(self, since=None):
+        res = self.client.get(SYNC_URL, {'since': since} if since else {})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_first_sync_returns_everything(self):
+        data = self.sync()
+        self.assertEqual([todo['title'] for todo in data['todos']], ['todo'])
+        self.assertEqual(data['todos'][0]['tag_list'], ['tag'])
+        self.assertEqual([tag['name'] for tag in data['tags']], ['tag'])
+        self.assertEqual(data['deleted'], {'todos': [], 'tags': []})
+        self.assertFalse(data['has_more'])
+
+    def test_nothing_changed(self):
+        cursor = self.sync()['cursor']
+        data = self.sync(cursor)
+        self.assertEqual((data['todos'], data['tags']), ([], []))
+        self.assertEqual(data['deleted'], {'todos': [], 'tags': []})
+
+    def test_changes_and_tombstones(self):
+        cursor = self.sync()['cursor']
+        other = Todo.objects.create(owner=self.user, title='other')
+        self.todo.delete()
+        data = self.sync(cursor)
+        self.assertEqual([todo['title'] for todo in data['todos']], ['other'])
+        self.assertEqual(data['deleted']['todos'], [self.todo.id])
+        # todo가 지워지면 tag의 todos/todo_count도 바뀐다
+        self.assertEqual([tag['todo_count'] for tag in data['tags']], [0])
+
+        # tag 연결만 바뀌어도 todo가 다시 내려온다
+        cursor = data['cursor']
+        self.tag.todos.add(other)
+        data = self.sync(cursor)
+        self.assertEqual([todo['tag_list'] for todo in data['todos']], [['tag']])
+        self.assertEqual([tag['todos'] for tag in data['tags']], [[other.id]])
+
+    def test_tag_tombstone_and_rename(self):
+        cursor = self.sync()['cursor']
+        self.tag.name = 'renamed'
+        self.tag.save()
+        data = self.sync(cursor)
+        self.assertEqual(data['todos'][0]['tag_list'], ['renamed'])
+
+        cursor = data['cursor']
+        self.todo.delete()
+        self.client.delete(reverse('tags-detail', args=[self.tag.id]))
+        data = self.sync(cursor)
+        self.assertEqual(data['deleted'], {'todos': [self.todo.id], 'tags': [self.tag.id]})
+        self.assertFalse(Tag.objects.filter(pk=self.tag.pk).exists())
+
+    def test_other_users_changes_are_hidden(self):
+        cursor = self.sync()['cursor']
+        other = get_user_model().objects.create_user(
+            email='test2@test.com',
+            username='testme2',
+            password='ckalscjf11',
+        )
+        Todo.objects.create(owner=other, title='not mine')
+        self.assertEqual(self.sync(cursor)['todos'], [])
+
+    @override_settings(TODOS_SYNC_PAGE_SIZE=2)
+    def test_paging(self):
+        for i in range(3):
+            Todo.objects.create(owner=self.user, title='todo %d' % i)
+        data = self.sync()
+        self.assertTrue(data['has_more'])
+        seen = [todo['title'] for todo in data['todos']]
+        data = self.sync(data['cursor'])
+        seen += [todo['title'] for todo in data['todos']]
+        self.assertFalse(data['has_more'])
+        self.assertEqual(sorted(seen), ['todo', 'todo 0', 'todo 1', 'todo 2'])
+
+    def test_query_count_does_not_grow_with_account(self):
+        cursor = self.sync()['cursor']
+        for i in range(20):
+            Todo.objects.create(owner=self.user, title='old %d' % i)
+        cursor = self.sync(cursor)['cursor']
+        Todo.objects.create(owner=self.user, title='new')
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.sync(cursor)
+        self.assertEqual([todo['title'] for todo in data['todos']], ['new'])
+        self.assertLessEqual(len(ctx), 6)
+
+    def test_invalid_and_expired_cursor(self):
+        res = self.client.get(SYNC_URL, {'since': 'nope'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        old = sync.encode_cursor({'todos': None, 'tags': None}, timezone.now() - datetime.timedelta(days=31))
+        res = self.client.get(SYNC_URL, {'since': old})
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+
+class SyncLagTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo = Todo.objects.create(owner=self.user, title='todo')
+
+    def sync(self, since=None):
+        res = self.client.get(SYNC_URL, {'since': since} if since else {})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_recent_rows_are_sent_again(self):
+        data = self.sync()
+        self.assertEqual([todo['title'] for todo in data['todos']], ['todo'])
+        data = self.sync(data['cursor'])
+        self.assertEqual([todo['title'] for todo in data['todos']], ['todo'])
+
+    def test_late_commit_is_not_skipped(self):
+        # cursor를 받은 뒤에, 그보다 이른 updated_at으로 commit된 row
+        Todo.objects.filter(pk=self.todo.pk).update(updated_at=timezone.now() - datetime.timedelta(minutes=1))
+        newer = Todo.objects.create(owner=self.user, title='newer')
+        cursor = self.sync()['cursor']
+        late = Todo.objects.create(owner=self.user, title='late')
+        Todo.objects.filter(pk=late.pk).update(updated_at=newer.updated_at - datetime.timedelta(seconds=1))
+        titles = [todo['title'] for todo in self.sync(cursor)['todos']]
+        self.assertIn('late', titles)
+        self.assertNotIn('todo', titles)
+
+    @override_settings(TODOS_SYNC_PAGE_SIZE=1)
+    def test_full_pages_still_advance(self):
+        Todo.objects.create(owner=self.user, title='second')
+        data = self.sync()
+        self.assertTrue(data['has_more'])
+        data = self.sync(data['cursor'])
+        self.assertEqual([todo['title'] for todo in data['todos']], ['second'])
@@ -0,0 +1,116 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos.models import Todo, Tag
+
+TODO_BASE_URL = reverse('todos-list')
+
+
+class TagTodoCountTest(TestCase):
+    # Tag.todo_count는 삭제되지 않은 todo 수와 항상 같아야 한다
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(owner=self.user, name='tag')
+        self.todos = [Todo.objects.create(owner=self.user, title='todo %d' % i) for i in range(3)]
+
+    def count(self, tag=None):
+        return Tag.objects.get(pk=(tag or self.tag).pk).todo_count
+
+    def test_m2m_changes(self):
+        self.tag.todos.add(*self.todos)
+        self.assertEqual(self.count(), 3)
+        self.tag.todos.add(self.todos[0])
+        self.assertEqual(self.count(), 3)
+        self.todos[0].tag_list.remove(self.tag)
+        self.assertEqual(self.count(), 2)
+        self.todos[0].tag_list.set([self.tag])
+        self.assertEqual(self.count(), 3)
+        self.todos[1].tag_list.clear()
+        self.assertEqual(self.count(), 2)
+        self.tag.todos.clear()
+        self.assertEqual(self.count(), 0)
+
+    def test_soft_delete_and_restore(self):
+        self.tag.todos.add(*self.todos)
+        todo = self.todos[0]
+        todo.delete()
+        todo.delete()
+        self.assertEqual(self.count(), 2)
+        todo.restore()
+        todo.restore()
+        self.assertEqual(self.count(), 3)
+
+    def test_deleted_todo_is_not_counted_when_tagged(self):
+        self.todos[0].delete()
+        self.todos[0].tag_list.add(self.tag)
+        self.assertEqual(self.count(), 0)
+
+    def test_api_paths(self):
+        res = self.client.post(TODO_BASE_URL, {'title': 'new', 'tag_list': ['tag']}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        todo_id = res.data['id']
+        self.assertEqual(self.count(), 1)
+
+        res = self.client.get(reverse('tags-detail', args=[self.tag.id]))
+        self.assertEqual(res.data['todo_count'], 1)
+
+        res = self.client.delete(reverse('tags-detail', args=[self.tag.id]))
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.client.delete(reverse('todos-detail', args=[todo_id]))
+        self.assertEqual(self.count(), 0)
+        res = self.client.delete(reverse('tags-detail', args=[self.tag.id]))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_bulk_paths(self):
+        other = Tag.objects.create(owner=self.user, name='other')
+        self.tag.todos.add(self.todos[0])
+        payload = {
+            'create': [{'title': 'bulk', 'tag_list': ['tag']}],
+            'update': [{'id': self.todos[0].id, 'tag_list': ['other']}],
+            'delete': [self.todos[1].id],
+        }
+        self.todos[1].tag_list.add(other)
+        res = self.client.post(TODO_BASE_URL + 'bulk/', payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(self.count(other), 1)
+
+    def test_bulk_delete_leaves_other_owners_tags(self):
+        # 남의 todo id를 보내도 그 owner의 tag는 다시 세거나 갱신하지 않는다
+        user2 = get_user_model().objects.create_user(username='testme2', password='ckalscjf11')
+        other_tag = Tag.objects.create(owner=user2, name='tag')
+        other_tag.todos.add(Todo.objects.create(owner=user2, title='other'))
+        other_tag.refresh_from_db()
+        payload = {'delete': list(other_tag.todos.values_list('id', flat=True))}
+        res = self.client.post(TODO_BASE_URL + 'bulk/', payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['deleted'], 0)
+        self.assertEqual(Tag.objects.get(pk=other_tag.pk).updated_at, other_tag.updated_at)
+        self.assertEqual(self.count(other_tag), 1)
+
+    def test_count_is_read_only(self):
+        res = self.client.patch(reverse('tags-detail', args=[self.tag.id]), {'todo_count': 10}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.count(), 0)
+
+    def test_reconcile_command(self):
+        self.tag.todos.add(*self.todos)
+        Tag.objects.filter(pk=self.tag.pk).update(todo_count=42)
+        out = io.StringIO()
+        call_command('reconcile_tag_counts', stdout=out)
+        self.assertEqual(self.count(), 3)
+        self.assertIn('Fixed 1 tag counts.', out.getvalue())
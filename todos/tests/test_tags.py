@@ -48,7 +48,7 @@ class PrivateTagsApiTests(TestCase):
         tags = Tag.objects.all().order_by('created_at')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
     
     def test_tags_limited_to_user(self):
         # tag가 만든 유저에게만 보이는지 테스트
@@ -62,8 +62,8 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAG_BASE_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
     
     def test_create_tag_successful(self):
         payload={
@@ -90,6 +90,17 @@ class PrivateTagsApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def test_deleted_at_is_not_writable(self):
+        tag = sample_tag(user=self.user)
+        url = TAG_BASE_URL + str(tag.id) + '/'
+        res = self.client.patch(url, {'deleted_at': '2020-01-01T00:00:00Z'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('deleted_at', res.data)
+        tag.refresh_from_db()
+        self.assertIsNone(tag.deleted_at)
+        self.assertTrue(Tag.objects.filter(id=tag.id).exists())
+
     def test_retrieve_todos_connected_to_tag(self):
         # tag와 연결된 todo들 제대로 받아오는지 테스트
         tag = sample_tag(user=self.user)
@@ -104,5 +115,57 @@ class PrivateTagsApiTests(TestCase):
         url = TAG_BASE_URL + str(tag.id) + '/todoList/'
         res = self.client.get(url)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(todo1.data, res.data)
-        self.assertNotIn(todo2.data, res.data)
+        self.assertIn(todo1.data, res.data['results'])
+        self.assertNotIn(todo2.data, res.data['results'])
+
+    def test_attach_and_detach_todos(self):
+        # 여러 todo에 tag를 한번에 붙이고 떼기
+        tag = sample_tag(user=self.user)
+        user2 = get_user_model().objects.create_user(
+            email='test2@test.com',
+            username='testme2',
+            password='ckalscjf11'
+        )
+        todos = [Todo.objects.create(owner=self.user, title=str(i)) for i in range(3)]
+        others = Todo.objects.create(owner=user2, title='other')
+        todos[0].tag_list.add(tag)
+
+        url = TAG_BASE_URL + str(tag.id) + '/'
+        ids = [todo.id for todo in todos] + [others.id]
+        res = self.client.post(url + 'attach/', {'todos': ids}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['changed'], 2)
+        self.assertEqual(set(tag.todos.all()), set(todos))
+
+        res = self.client.post(url + 'detach/', {'todos': ids[:2]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['changed'], 2)
+        self.assertEqual(list(tag.todos.all()), [todos[2]])
+
+    def test_detach_leaves_unlinked_todos_alone(self):
+        # 연결되지 않은 todo(다른 유저 것 포함)는 updated_at이 바뀌면 안 됨
+        tag = sample_tag(user=self.user)
+        user2 = get_user_model().objects.create_user(
+            email='test2@test.com',
+            username='testme2',
+            password='ckalscjf11'
+        )
+        mine = Todo.objects.create(owner=self.user, title='mine')
+        other = Todo.objects.create(owner=user2, title='other')
+        stamps = {todo.id: todo.updated_at for todo in (mine, other)}
+
+        url = TAG_BASE_URL + str(tag.id) + '/detach/'
+        res = self.client.post(url, {'todos': [mine.id, other.id]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['changed'], 0)
+        for todo in (mine, other):
+            todo.refresh_from_db()
+            self.assertEqual(todo.updated_at, stamps[todo.id])
+
+    def test_sparse_tag_fields(self):
+        tag = sample_tag(user=self.user)
+        Todo.objects.create(owner=self.user).tag_list.add(tag)
+        res = self.client.get(TAG_BASE_URL, {'fields': 'id,name'})
+        self.assertEqual(res.data['results'], [{'id': tag.id, 'name': tag.name}])
+        res = self.client.get(TAG_BASE_URL, {'fields': 'id', 'expand': 'todos'})
+        self.assertEqual(len(res.data['results'][0]['todos']), 1)
@@ -0,0 +1,146 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from testing import settings as project_settings
+from todos.models import Todo, Tag
+from todos.throttling import ReadWriteRateThrottle
+
+TODOS_URL = reverse('todos-list')
+TAGS_URL = reverse('tags-list')
+TOKEN_URL = reverse('login')
+
+RATES = {
+    'todos.read': '3/min',
+    'todos.write': '1/min',
+    'tags.read': '2/min',
+    'auth.write': '2/min',
+}
+
+
+@override_settings(TODOS_THROTTLE_RATES=RATES, TODOS_THROTTLE_CACHE='default')
+class ThrottleTest(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_reads_are_limited_per_scope(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+        res = self.client.get(TODOS_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        # tags는 별도 scope라 영향 없음
+        self.assertEqual(self.client.get(TAGS_URL).status_code, status.HTTP_200_OK)
+
+    def test_writes_have_their_own_limit(self):
+        res = self.client.post(TODOS_URL, {'title': 'a', 'tag_list': []}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.post(TODOS_URL, {'title': 'b', 'tag_list': []}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(Todo.objects.count(), 1)
+        self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+
+    def test_users_are_counted_separately(self):
+        for _ in range(3):
+            self.client.get(TODOS_URL)
+        other = get_user_model().objects.create_user(username='other', password='ckalscjf11')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+
+    def test_throttled_request_skips_the_database(self):
+        Tag.objects.create(owner=self.user, name='tag')
+        for _ in range(2):
+            self.client.get(TAGS_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_auth_routes_are_limited_per_ip(self):
+        self.client.force_authenticate(user=None)
+        payload = {'username': 'testme', 'password': 'wrong'}
+        for _ in range(2):
+            res = self.client.post(TOKEN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(TOKEN_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(TODOS_THROTTLE_RATES={})
+    def test_unconfigured_scopes_are_not_throttled(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+
+
+class DefaultRatesTest(TestCase):
+    # 테스트 runner는 rate를 비우므로 설정 파일의 값을 직접 본다
+    def test_every_scope_is_limited(self):
+        for scope in ('todos', 'tags', 'auth'):
+            for kind in ('read', 'write'):
+                rate = project_settings.TODOS_THROTTLE_RATES.get('%s.%s' % (scope, kind))
+                self.assertIsNotNone(rate, '%s.%s' % (scope, kind))
+                num_requests, _ = ReadWriteRateThrottle().parse_rate(rate)
+                self.assertGreater(num_requests, 0)
+
+
+class FileThrottleTest(TestCase):
+    # 설정의 'throttle' alias(FileBasedCache)로, worker끼리 같은 counter를 본다
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = directory.name
+        caches_setting = {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'throttle': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.location,
+            },
+        }
+        override = override_settings(
+            CACHES=caches_setting, TODOS_THROTTLE_RATES={'todos.read': '2/min'},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testme', password='ckalscjf11')
+        self.client.force_authenticate(user=self.user)
+
+    def test_counters_are_shared_through_the_files(self):
+        self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+        self.assertTrue(os.listdir(self.location))
+        # 같은 디렉터리를 따로 연 cache = 다른 worker 프로세스
+        other_worker = FileBasedCache(self.location, {})
+        with mock.patch.object(ReadWriteRateThrottle, 'cache', other_worker):
+            self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_interleaved_requests_are_both_counted(self):
+        # 첫 요청이 counter를 읽은 직후 다른 worker의 요청이 끼어든다.
+        # get()/set()이면 나중에 쓴 쪽이 앞의 count를 덮어쓴다
+        get = FileBasedCache.get
+        interrupted = []
+
+        def get_then_interleave(cache, *args, **kwargs):
+            value = get(cache, *args, **kwargs)
+            if not interrupted:
+                interrupted.append(True)
+                self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+            return value
+
+        with mock.patch.object(FileBasedCache, 'get', get_then_interleave):
+            self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(TODOS_URL).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,86 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+
+from todos.instrumentation import ServerTimingMiddleware
+from todos.models import Todo
+from todos.replicas import ReplicaRoutingMiddleware
+from todos.tests.test_async import asgi_request
+
+TODO_BASE_URL = reverse('todos-list')
+
+
+class ServerTimingTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@test.com',
+            username='testme',
+            password='ckalscjf11',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo = Todo.objects.create(owner=self.user, title='todo')
+
+    def metrics(self, res):
+        return {metric.split(';')[0]: metric for metric in res['Server-Timing'].split(', ')}
+
+    def test_disabled_by_default(self):
+        res = self.client.get(TODO_BASE_URL)
+        self.assertNotIn('Server-Timing', res)
+
+    @override_settings(TODOS_SERVER_TIMING=True, TODOS_LIST_CACHE_TIMEOUT=0)
+    def test_header(self):
+        metrics = self.metrics(self.client.get(reverse('todos-detail', args=[self.todo.id])))
+        self.assertEqual(set(metrics), {'db', 'auth', 'serialize', 'render', 'total'})
+        self.assertRegex(metrics['db'], r'db;dur=[\d.]+;desc="\d+ queries"')
+
+        # values() 경로도 serialize 시간이 잡혀야 한다
+        metrics = self.metrics(self.client.get(TODO_BASE_URL))
+        self.assertIn('serialize', metrics)
+
+    @override_settings(TODOS_SERVER_TIMING=True, TODOS_SLOW_REQUEST_MS=0)
+    def test_slow_request_log(self):
+        with self.assertLogs('todos.timing', 'WARNING') as logs:
+            self.client.get(reverse('todos-detail', args=[self.todo.id]))
+        self.assertIn('TodoViewSet.retrieve', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(TODOS_SERVER_TIMING=True)
+    def test_fast_request_is_not_logged(self):
+        with self.assertNoLogs('todos.timing', 'WARNING'):
+            self.client.get(reverse('todos-detail', args=[self.todo.id]))
+
+
+@override_settings(TODOS_SERVER_TIMING=True)
+class AsyncMiddlewareTest(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testme', password='ckalscjf11')
+        self.token = Token.objects.create(user=self.user).key
+        Todo.objects.create(owner=self.user, title='todo')
+
+    @override_settings(TODOS_READ_REPLICAS=['replica'])
+    async def test_async_chain_stays_async(self):
+        async def view(request):
+            return HttpResponse()
+
+        for middleware_class in (ReplicaRoutingMiddleware, ServerTimingMiddleware):
+            middleware = middleware_class(view)
+            self.assertTrue(asyncio.iscoroutinefunction(middleware))
+            self.assertFalse(asyncio.iscoroutinefunction(middleware_class(lambda request: HttpResponse())))
+        response = await middleware(RequestFactory().get('/'))
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    @override_settings(ROOT_URLCONF='todos.tests.test_async', TODOS_SLOW_REQUEST_MS=0)
+    async def test_queries_of_async_views_are_timed(self):
+        # 설정을 읽도록 handler를 새로 만든다
+        with self.assertLogs('todos.timing', 'WARNING') as logs:
+            code, _ = await asgi_request('/async/todos/', self.token, app=ASGIHandler())
+        self.assertEqual(code, 200)
+        self.assertRegex(logs.output[0], r'[1-9]\d* queries')
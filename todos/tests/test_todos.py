@@ -1,7 +1,11 @@
+import csv
+import json
 import datetime
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from rest_framework.test import APIClient
@@ -66,7 +70,7 @@ class PrivateTodoTest(TestCase):
         todos = Todo.objects.all().order_by('created_at')
         serializer = TodoSerializer(todos, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_todos_limited_to_user(self):
         # 유저에게 귀속된 todo만 받아오는지 확인
@@ -83,8 +87,8 @@ class PrivateTodoTest(TestCase):
         todos = Todo.objects.filter(owner=self.user).order_by('created_at')
         serializer = TodoSerializer(todos, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
     
     def test_create_todo(self):
         # 기본 todo create test
@@ -135,6 +139,52 @@ class PrivateTodoTest(TestCase):
         self.assertEqual(len(tags), 1)
         self.assertIn(new_tag, tags)
 
+    def test_tags_resolved_per_owner(self):
+        # 다른 유저가 같은 이름의 tag를 가지고 있어도 내 tag로 연결
+        other = get_user_model().objects.create_user(
+            email='other@test.com',
+            username='other',
+            password='ckalscjf11',
+        )
+        sample_tag(user=other, name='shared')
+        mine = sample_tag(user=self.user, name='shared')
+        res = self.client.post(TODO_BASE_URL, {'title': 'todo', 'tag_list': ['shared']}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(Todo.objects.get(id=res.data['id']).tag_list.all()), [mine])
+
+        sample_tag(user=other, name='only-theirs')
+        res = self.client.post(TODO_BASE_URL, {'title': 'todo', 'tag_list': ['only-theirs']}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tag_list', res.data)
+
+    @override_settings(TODOS_CREATE_MISSING_TAGS=True)
+    def test_create_missing_tags(self):
+        existing = sample_tag(user=self.user, name='existing')
+        payload = {'title': 'todo', 'tag_list': ['existing', 'fresh', 'fresh']}
+        res = self.client.post(TODO_BASE_URL, payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['tag_list'], ['existing', 'fresh'])
+        fresh = Tag.objects.get(owner=self.user, name='fresh')
+        self.assertEqual(set(Todo.objects.get(id=res.data['id']).tag_list.all()), {existing, fresh})
+
+    def test_tag_write_queries_do_not_grow(self):
+        # tag 수와 상관없이 query 수가 같아야 한다
+        tags = [sample_tag(user=self.user, name='tag %d' % i) for i in range(12)]
+        todo = sample_todo(user=self.user)
+        url = TODO_BASE_URL + str(todo.id) + '/'
+
+        def patch(names):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.patch(url, {'tag_list': names}, format='json')
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.data['tag_list'], names)
+            return len(ctx)
+
+        patch([tags[0].name])
+        few = patch([tag.name for tag in tags[1:3]])
+        many = patch([tag.name for tag in tags[3:]])
+        self.assertEqual(few, many)
+
     def test_delete_todo(self):
         # delete 시 data가 안보이는지 확인
         todo = sample_todo(user=self.user)
@@ -162,9 +212,149 @@ class PrivateTodoTest(TestCase):
         future_todo = TodoSerializer(future_todo)
         in3days_todo = TodoSerializer(in3days_todo)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertNotIn(past_todo.data, res.data)
-        self.assertNotIn(future_todo.data, res.data)
-        self.assertIn(in3days_todo.data, res.data)
+        self.assertNotIn(past_todo.data, res.data['results'])
+        self.assertNotIn(future_todo.data, res.data['results'])
+        self.assertIn(in3days_todo.data, res.data['results'])
 
     
 
+    def test_bulk_create_update_delete(self):
+        # 여러 todo를 한번에 생성/수정/삭제
+        tag = sample_tag(user=self.user)
+        to_update = sample_todo(user=self.user)
+        to_delete = sample_todo(user=self.user)
+        payload = {
+            'create': [
+                {'title': 'bulk 1', 'tag_list': [tag.name]},
+                {'title': 'bulk 2', 'tag_list': []},
+            ],
+            'update': [
+                {'id': to_update.id, 'title': 'updated', 'is_ended': True, 'tag_list': [tag.name]},
+            ],
+            'delete': [to_delete.id],
+        }
+        res = self.client.post(TODO_BASE_URL + 'bulk/', payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([todo['title'] for todo in res.data['created']], ['bulk 1', 'bulk 2'])
+        self.assertEqual(res.data['created'][0]['tag_list'], [tag.name])
+        self.assertEqual(res.data['deleted'], 1)
+
+        to_update.refresh_from_db()
+        self.assertEqual(to_update.title, 'updated')
+        self.assertIsNotNone(to_update.end_date)
+        self.assertIn(tag, to_update.tag_list.all())
+        self.assertFalse(Todo.objects.filter(id=to_delete.id).exists())
+        self.assertEqual(Todo.objects.filter(owner=self.user, title__startswith='bulk').count(), 2)
+
+    def test_bulk_rejects_other_users_todos(self):
+        user2 = get_user_model().objects.create_user(
+            email = 'test2@test.com',
+            username = 'testme2',
+            password = 'ckalscjf11',
+        )
+        other = sample_todo(user=user2)
+        payload = {'update': [{'id': other.id, 'title': 'hijacked'}]}
+        res = self.client.post(TODO_BASE_URL + 'bulk/', payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        other.refresh_from_db()
+        self.assertEqual(other.title, 'test')
+
+    def test_bulk_rejects_duplicate_updates(self):
+        # 같은 id를 두 번 수정하면 마지막 것만 남는 대신 거부
+        todo = sample_todo(user=self.user)
+        payload = {'update': [{'id': todo.id, 'title': 'first'}, {'id': todo.id, 'title': 'second'}]}
+        res = self.client.post(TODO_BASE_URL + 'bulk/', payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        todo.refresh_from_db()
+        self.assertEqual(todo.title, 'test')
+
+    def test_bulk_rejects_boolean_ids(self):
+        todo = sample_todo(user=self.user)
+        payload = {'update': [{'id': True, 'title': 'y'}]}
+        res = self.client.post(TODO_BASE_URL + 'bulk/', payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        todo.refresh_from_db()
+        self.assertEqual(todo.title, 'test')
+
+    def test_deadline_window(self):
+        # 기간/overdue/is_ended 조건으로 마감일 조회, 다른 유저 todo는 제외
+        now = timezone.now()
+        user2 = get_user_model().objects.create_user(
+            email = 'test2@test.com',
+            username = 'testme2',
+            password = 'ckalscjf11',
+        )
+        sample_todo(user=user2, desired_end_date=now + timezone.timedelta(days=1))
+        overdue = sample_todo(user=self.user, title='overdue', desired_end_date=now - timezone.timedelta(days=1))
+        sample_todo(user=self.user, title='done', is_ended=True, desired_end_date=now - timezone.timedelta(days=2))
+        soon = sample_todo(user=self.user, title='soon', desired_end_date=now + timezone.timedelta(days=1))
+        later = sample_todo(user=self.user, title='later', desired_end_date=now + timezone.timedelta(days=10))
+        url = TODO_BASE_URL + 'deadlines/'
+
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([todo['id'] for todo in res.data['results']], [soon.id])
+
+        res = self.client.get(url, {'from': now.isoformat(), 'to': (now + timezone.timedelta(days=30)).isoformat()})
+        self.assertEqual([todo['id'] for todo in res.data['results']], [soon.id, later.id])
+
+        res = self.client.get(url, {'overdue': 'true'})
+        self.assertEqual([todo['id'] for todo in res.data['results']], [overdue.id])
+
+        res = self.client.get(url, {'from': (now - timezone.timedelta(days=5)).isoformat(), 'is_ended': 'true'})
+        self.assertEqual([todo['title'] for todo in res.data['results']], ['done'])
+
+        res = self.client.get(url, {'from': now.isoformat(), 'to': (now - timezone.timedelta(days=1)).isoformat()})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_ndjson(self):
+        # export 결과가 TodoSerializer와 같은 내용인지 확인
+        tag = sample_tag(user=self.user)
+        todo = sample_todo(user=self.user)
+        todo.tag_list.add(tag)
+        sample_todo(user=self.user, title='second')
+        res = self.client.get(TODO_BASE_URL + 'export/')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        body = b''.join(res.streaming_content).decode()
+        rows = [json.loads(line) for line in body.splitlines()]
+        todos = Todo.objects.filter(owner=self.user).order_by('created_at', 'id')
+        self.assertEqual(rows, json.loads(json.dumps(TodoSerializer(todos, many=True).data)))
+
+    def test_export_csv_in_chunks(self):
+        for i in range(5):
+            sample_todo(user=self.user, title='todo %d' % i)
+        with self.settings(TODOS_EXPORT_CHUNK_SIZE=2):
+            res = self.client.get(TODO_BASE_URL + 'export/', {'type': 'csv'})
+            rows = list(csv.reader(b''.join(res.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], list(TodoSerializer.Meta.fields))
+        self.assertEqual([row[5] for row in rows[1:]], ['todo %d' % i for i in range(5)])
+
+    def test_export_unknown_type(self):
+        res = self.client.get(TODO_BASE_URL + 'export/', {'type': 'xml'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sparse_fields(self):
+        # ?fields= 로 필요한 필드만, tag는 ?expand=tags 일때만
+        todo = sample_todo(user=self.user)
+        todo.tag_list.add(sample_tag(user=self.user))
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(TODO_BASE_URL, {'fields': 'id,title,is_ended,desired_end_date'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data['results'][0]), ['id', 'title', 'desired_end_date', 'is_ended'])
+        self.assertEqual(len(ctx), 1)
+        self.assertNotIn('description', ctx.captured_queries[0]['sql'])
+
+        res = self.client.get(TODO_BASE_URL, {'fields': 'id,title', 'expand': 'tags'})
+        self.assertEqual(res.data['results'][0]['tag_list'], ['name'])
+
+        url = TODO_BASE_URL + str(todo.id) + '/'
+        res = self.client.get(url, {'fields': 'id,owner'})
+        self.assertEqual(res.data, {'id': todo.id, 'owner': self.user.username})
+
+    def test_sparse_fields_with_deadlines(self):
+        sample_todo(user=self.user, desired_end_date=timezone.now() + timezone.timedelta(days=1))
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(TODO_BASE_URL + 'deadlines/', {'fields': 'id,title'})
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual(list(res.data['results'][0]), ['id', 'title'])
@@ -1,17 +1,23 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 # from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.reverse import reverse
 from django.urls import resolve
 
+from todos.models import Todo, Tag
 from todos.serializers import UserSerializer
 
 CREATE_USER_URL = reverse('user-list')
 TOKEN_URL = reverse('login')
 ME_URL = reverse('user-me')
+JWT_URL = reverse('jwt-create')
+TODO_BASE_URL = reverse('todos-list')
 
 def create_user(**params):
     return get_user_model().objects.create_user(**params)
@@ -44,6 +50,23 @@ class PublicUserTest(TestCase):
         self.assertIn('auth_token', res.data)
         # login_res = self.client.post(ME_URL)
     
+    @override_settings(TODOS_JWT_SIGNUP=True)
+    def test_create_user_with_jwt(self):
+        # JWT 모드에서는 회원가입 응답에 JWT도 같이 발급
+        payload = {
+            'email': 'test1@test.com',
+            'username': 'testme1',
+            'password': 'ckalscjf11',
+            're_password': 'ckalscjf11',
+        }
+        res = self.client.post(CREATE_USER_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn('auth_token', res.data)
+        self.assertIn('access', res.data['jwt'])
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + res.data['jwt']['access'])
+        res = self.client.get(TODO_BASE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_user_exists(self):
         # 존재하는 유저 다시 생성안되는지 테스트
         payload = {
@@ -104,4 +127,86 @@ class PrivateUserTest(TestCase):
         user_payload = UserSerializer(self.user)
         res = self.client.get(ME_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data,user_payload.data)
\ No newline at end of file
+        self.assertEqual(res.data,user_payload.data)
+
+class UserSummaryTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email = 'test@test.com',
+            username = 'testme',
+            password = 'ckalscjf11',
+        )
+        self.client.force_authenticate(user = self.user)
+        Todo.objects.create(owner=self.user, title='open')
+        Todo.objects.create(owner=self.user, title='done', is_ended=True)
+        Todo.objects.create(owner=self.user, title='deleted', is_ended=True).delete()
+        Tag.objects.create(owner=self.user, name='tag')
+
+    def test_list_counts(self):
+        # 유저 목록은 title 대신 개수만 (삭제된 todo 제외)
+        res = self.client.get(reverse('users-list'))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{
+            'id': self.user.id, 'username': 'testme',
+            'todo_count': 2, 'completed_count': 1, 'tag_count': 1,
+        }])
+
+    def test_list_is_one_query(self):
+        for i in range(5):
+            user = create_user(email='u%d@test.com' % i, username='u%d' % i, password='ckalscjf11')
+            Todo.objects.create(owner=user, title='todo')
+        with self.assertNumQueries(1):
+            res = self.client.get(reverse('users-list'))
+        self.assertEqual(len(res.data['results']), 6)
+
+    def test_full_detail(self):
+        res = self.client.get(reverse('users-full', args=[self.user.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(res.data['todos']), ['done', 'open'])
+        self.assertEqual(res.data['tags'], ['tag'])
+
+        res = self.client.get(reverse('users-detail', args=[self.user.id]))
+        self.assertEqual(res.data['todo_count'], 2)
+        self.assertNotIn('todos', res.data)
+
+
+class JWTAuthTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email = 'test@test.com',
+            username = 'testme',
+            password = 'ckalscjf11',
+        )
+        self.todo = Todo.objects.create(owner=self.user, title='todo')
+
+    def count_todo_detail_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(TODO_BASE_URL + str(self.todo.id) + '/')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(ctx)
+
+    def test_jwt_skips_user_lookup(self):
+        # JWT로 인증하면 token/user 조회 query가 없어야 함
+        res = self.client.post(JWT_URL, {'username': 'testme', 'password': 'ckalscjf11'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + res.data['access'])
+        jwt_queries = self.count_todo_detail_queries()
+
+        res = self.client.post(TOKEN_URL, {'username': 'testme', 'password': 'ckalscjf11'})
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + res.data['auth_token'])
+        token_queries = self.count_todo_detail_queries()
+        self.assertEqual(jwt_queries, token_queries - 1)
+
+    def test_jwt_creates_owned_todo(self):
+        res = self.client.post(JWT_URL, {'username': 'testme', 'password': 'ckalscjf11'})
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + res.data['access'])
+        res = self.client.post(TODO_BASE_URL, {'title': 'jwt todo'})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['owner'], self.user.username)
+
+    def test_invalid_jwt_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        res = self.client.get(TODO_BASE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,72 @@
+"""
+Request throttling with separate read and write limits per scope.
+
+A view names its ``throttle_scope`` ('todos', 'tags'); djoser and simplejwt
+views count as 'auth'. Each request is counted against ``'<scope>.read'``
+(safe methods) or ``'<scope>.write'`` in ``TODOS_THROTTLE_RATES``, per user,
+or per client IP before login. Counters are fixed windows in the
+``TODOS_THROTTLE_CACHE`` cache, which all workers should share, so a
+rejected request costs one cache read and no queries.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+AUTH_PACKAGES = ('djoser', 'rest_framework_simplejwt')
+
+
+def get_scope(view):
+    scope = getattr(view, 'throttle_scope', None)
+    if scope is None and type(view).__module__.split('.')[0] in AUTH_PACKAGES:
+        return 'auth'
+    return scope
+
+
+class ReadWriteRateThrottle(SimpleRateThrottle):
+    cache_format = 'throttle_%(scope)s_%(ident)s_%(window)d'
+
+    def __init__(self):
+        # The scope, and so the rate, is only known per request.
+        pass
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'TODOS_THROTTLE_CACHE', 'default')]
+
+    def get_rate(self):
+        return getattr(settings, 'TODOS_THROTTLE_RATES', {}).get(self.scope)
+
+    def get_cache_key(self, request, view):
+        user = request.user
+        ident = user.pk if user and user.is_authenticated else self.get_ident(request)
+        window = self.now // self.duration
+        return self.cache_format % {'scope': self.scope, 'ident': ident, 'window': window}
+
+    def allow_request(self, request, view):
+        scope = get_scope(view)
+        if scope is None:
+            return True
+        self.scope = '%s.%s' % (scope, 'read' if request.method in SAFE_METHODS else 'write')
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.now = self.timer()
+        self.key = self.get_cache_key(request, view)
+        # Shed an over-limit client with a single read.
+        if self.cache.get(self.key, 0) >= self.num_requests:
+            return False
+        # add() never overwrites another worker's counter, and incr() is
+        # atomic on memcached and redis.
+        self.cache.add(self.key, 0, self.duration)
+        try:
+            count = self.cache.incr(self.key)
+        except ValueError:
+            # The window expired between add() and incr().
+            self.cache.add(self.key, 0, self.duration)
+            count = self.cache.incr(self.key)
+        return count <= self.num_requests
+
+    def wait(self):
+        return self.duration - self.now % self.duration
@@ -1,13 +1,26 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework import routers
-from todos import views
+from todos import async_views, views
 
 router = routers.DefaultRouter()
 router.register(r'todos', views.TodoViewSet, basename='todos')
 router.register(r'tags', views.TagViewSet, basename='tags')
 router.register(r'users', views.UserViewSet, basename='users')
 
-urlpatterns = [
+# Routes listed in TODOS_ASYNC_ROUTES are served by their async views.
+async_routes = [
+    path(*async_views.ROUTES[name])
+    for name in getattr(settings, 'TODOS_ASYNC_ROUTES', [])
+]
+
+urlpatterns = async_routes + [
     path('', include(router.urls)),
     path('tags/<int:pk>/todoList/', views.TodoListByTag.as_view(), name='todo-list-by-tag'),
-]
\ No newline at end of file
+    path('sync/', views.SyncFeed.as_view(), name='sync'),
+    path('stats/', views.StatsView.as_view(), name='stats'),
+]
+
+# The async views side by side with the sync ones, e.g. to compare them.
+if getattr(settings, 'TODOS_ASYNC_VIEWS', False):
+    urlpatterns.append(path('async/', include(async_views.urlpatterns)))
@@ -1,57 +1,205 @@
 from django.contrib.auth.models import User
 from django.utils import timezone
-from django.http import Http404
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, StreamingHttpResponse
 import datetime
 from rest_framework import generics, permissions, status, viewsets
+from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import api_view, action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTTokenUserAuthentication
 
+from . import bulk, export, importer, search, stats, sync
+from .cache import CachedListMixin
+from .fast import FastTodoListMixin
+from .instrumentation import TimingMixin
 from .models import Todo, Tag
 from .permissions import IsOwner
-from .serializers import TagSerializer, TodoSerializer, UserTodoTagSerializer
-from .filters import OwnerFilterBackend
+from .serializers import (
+    DeadlineWindowSerializer, StatsRangeSerializer, TagSerializer, TagTodoIdsSerializer, TodoBulkSerializer,
+    TodoSerializer, UserSummarySerializer, UserTodoTagSerializer,
+)
+from .filters import OwnerFilterBackend, SparseFieldsFilterBackend
+from .pagination import (
+    DeadlineCursorPagination, KeysetCursorPagination, SearchPagination, UserCursorPagination
+)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+def user_counts():
+    """
+    Per-user todo, completed and tag counts as correlated subqueries, so a
+    page of users is one query that reads only the owner indexes.
+    """
+    def count(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(owner=OuterRef('pk')).order_by().values('owner')
+            .annotate(count=Count('*')).values('count')
+        ), 0)
+    return {
+        'todo_count': count(Todo.objects.all()),
+        'completed_count': count(Todo.objects.filter(is_ended=True)),
+        'tag_count': count(Tag.objects.all()),
+    }
+
+
+class UserViewSet(TimingMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserTodoTagSerializer
+    pagination_class = UserCursorPagination
+
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return User.objects.annotate(**user_counts())
+        if self.action == 'full':
+            return User.objects.prefetch_related('todos', 'tags')
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve'):
+            return UserSummarySerializer
+        return super().get_serializer_class()
+
+    @action(detail=True)
+    def full(self, request, pk=None):
+        # Every todo title and tag name of the user; opt-in, unpaginated.
+        return Response(self.get_serializer(self.get_object()).data)
+
 
-class TodoViewSet(viewsets.ModelViewSet):
-    queryset = Todo.objects.all()
+class TodoViewSet(TimingMixin, CachedListMixin, FastTodoListMixin, viewsets.ModelViewSet):
+    throttle_scope = 'todos'
+    queryset = Todo.objects.select_related('owner').prefetch_related('tag_list')
     serializer_class = TodoSerializer
+    authentication_classes = (JWTTokenUserAuthentication, TokenAuthentication)
     permission_classes = (permissions.IsAuthenticated, IsOwner)
-    filter_backends = [OwnerFilterBackend]
+    filter_backends = [OwnerFilterBackend, SparseFieldsFilterBackend]
+    pagination_class = KeysetCursorPagination
 
-    @action(detail=False)
+    def deadline_window_response(self, params):
+        now = timezone.now()
+        queryset = self.filter_queryset(self.get_queryset()).filter(desired_end_date__isnull=False)
+        if params.get('overdue'):
+            queryset = queryset.filter(desired_end_date__lt=now).exclude(is_ended=True)
+            window = (params.get('from'), params.get('to'))
+        else:
+            window = (
+                params.get('from', now),
+                params.get('to', now + datetime.timedelta(days=3)),
+            )
+        if window[0] is not None:
+            queryset = queryset.filter(desired_end_date__gte=window[0])
+        if window[1] is not None:
+            queryset = queryset.filter(desired_end_date__lte=window[1])
+        if 'is_ended' in params:
+            if params['is_ended']:
+                queryset = queryset.filter(is_ended=True)
+            else:
+                queryset = queryset.exclude(is_ended=True)
+
+        return self.fast_list_response(queryset)
+
+    @action(detail=False, pagination_class=DeadlineCursorPagination)
+    def deadlines(self, request):
+        params = DeadlineWindowSerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        return self.deadline_window_response(params.validated_data)
+
+    @action(detail=False, pagination_class=DeadlineCursorPagination)
     def within3days(self, request):
-        queryset = Todo.objects.filter(
-            desired_end_date__range=(
-                timezone.now(),
-                timezone.now()+ datetime.timedelta(days=3)
-                ))
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.deadline_window_response({})
+
+    @action(detail=False, pagination_class=SearchPagination)
+    def search(self, request):
+        query = request.query_params.get('q', '')
+        if not search.match_expression(query):
+            raise ValidationError({'q': 'Enter at least one word to search for.'})
+        queryset = search.search_todos(self.filter_queryset(self.get_queryset()), query)
+        return self.fast_list_response(queryset)
+
+    @action(detail=False)
+    def export(self, request):
+        kind = request.query_params.get('type', 'ndjson')
+        if kind not in export.FORMATS:
+            raise ValidationError({'type': 'Choose one of: %s.' % ', '.join(export.FORMATS)})
+        stream, content_type = export.FORMATS[kind]
+        queryset = self.filter_queryset(Todo.objects.all())
+        response = StreamingHttpResponse(stream(queryset), content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="todos.%s"' % kind
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_file(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Upload an NDJSON or CSV file.'})
+        kind = request.data.get('type') or upload.name.rsplit('.', 1)[-1]
+        if kind not in importer.READERS:
+            raise ValidationError({'type': 'Choose one of: %s.' % ', '.join(importer.READERS)})
+        result = importer.import_todos(request.user.id, importer.READERS[kind](upload))
+        return Response(result)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = TodoBulkSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        owner_id = request.user.id
+        with transaction.atomic():
+            created = bulk.create_todos(owner_id, data.get('create', []))
+            updated = bulk.update_todos(owner_id, data.get('update', {}))
+            deleted = bulk.delete_todos(owner_id, data.get('delete', []))
+        todos = self.get_queryset().in_bulk([todo.id for todo in created + updated])
+        return Response({
+            'created': self.get_serializer(
+                [todos[todo.id] for todo in created if todo.id in todos], many=True).data,
+            'updated': self.get_serializer(
+                [todos[todo.id] for todo in updated if todo.id in todos], many=True).data,
+            'deleted': deleted,
+        })
 
     def perform_create(self, serializer):
-        return serializer.save(owner=self.request.user)
+        return serializer.save(owner_id=self.request.user.id)
     def perform_update(self, serializer):
         if self.request.data.get('is_ended'):
             serializer.save(end_date=timezone.now())
         else:
             serializer.save()
 
-class TagViewSet(viewsets.ModelViewSet):
-    queryset = Tag.objects.all()
+class TagViewSet(TimingMixin, CachedListMixin, viewsets.ModelViewSet):
+    throttle_scope = 'tags'
+    queryset = Tag.objects.select_related('owner').prefetch_related('todos')
     serializer_class = TagSerializer
+    authentication_classes = (JWTTokenUserAuthentication, TokenAuthentication)
     permission_classes = (permissions.IsAuthenticated, IsOwner)
-    filter_backends = [OwnerFilterBackend]
+    filter_backends = [OwnerFilterBackend, SparseFieldsFilterBackend]
+    pagination_class = KeysetCursorPagination
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        serializer.save(owner_id=self.request.user.id)
+
+    def change_todos(self, request, change):
+        tag = self.get_object()
+        serializer = TagTodoIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            changed = change(tag, serializer.validated_data['todos'])
+        return Response({'changed': changed})
+
+    @action(detail=True, methods=['post'])
+    def attach(self, request, pk=None):
+        return self.change_todos(request, bulk.attach_tag)
+
+    @action(detail=True, methods=['post'])
+    def detach(self, request, pk=None):
+        return self.change_todos(request, bulk.detach_tag)
+
     def destroy(self, request, *args, **kwargs):
         try:
             tag = self.get_object()
-            if not tag.todos.count():
+            if not tag.todo_count:
                 tag.delete()
             else:
                 return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -60,13 +208,37 @@ class TagViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class TodoListByTag(generics.ListAPIView):
+class SyncFeed(TimingMixin, APIView):
+    authentication_classes = (JWTTokenUserAuthentication, TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        return Response(sync.feed(request, request.user.id, request.query_params.get('since')))
+
+
+class StatsView(TimingMixin, APIView):
+    authentication_classes = (JWTTokenUserAuthentication, TokenAuthentication)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        params = StatsRangeSerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        window = params.validated_data
+        return Response(stats.summarize(request.user.id, window['from'], window['to']))
+
+
+class TodoListByTag(TimingMixin, CachedListMixin, FastTodoListMixin, generics.ListAPIView):
+    throttle_scope = 'todos'
     serializer_class = TodoSerializer
+    authentication_classes = (JWTTokenUserAuthentication, TokenAuthentication)
     permission_classes = (permissions.IsAuthenticated, IsOwner)
-    filter_backends = [OwnerFilterBackend]
+    filter_backends = [OwnerFilterBackend, SparseFieldsFilterBackend]
+    pagination_class = KeysetCursorPagination
     
     def get_queryset(self):
-        return Tag.objects.get(pk=self.kwargs['pk']).todos.all()
+        return Todo.objects.filter(
+            tag_list=self.kwargs['pk']
+        ).select_related('owner').prefetch_related('tag_list')
 
 
 